@@ -3,39 +3,61 @@ from bisque.element import nonwhitespace_re
 __all__ = ["AttrList"]
 
 
+def _split_tokens(value):
+    """Split a multi-valued attribute value on whitespace.
+
+    `str.split()` splits on exactly the characters `nonwhitespace_re` treats
+    as whitespace, without going through the regex engine.
+    """
+    if value.__class__ is str:
+        return value.split()
+    return nonwhitespace_re.findall(value)
+
+
 class AttrList:
-    def __init__(self, element):
+    def __init__(self, element, builder=None):
         self.element = element
-        self.attrs = dict(self.element.attrs)
+        self.builder = builder
 
     def __iter__(self):
-        return list(self.attrs.items()).__iter__()
+        return iter(self.element.attrs.items())
 
     def __setitem__(self, name, value):
-        # If this attribute is a multi-valued attribute for this element,
-        # turn its value into a list.
+        self.set_many(((name, value),), self.multi_valued_names())
+
+    def multi_valued_names(self):
+        """The attribute names whose values are lists on this element."""
+        if self.builder is not None:
+            return self.builder.cdata_list_attributes_for(self.element.name)
         list_attr = self.element.cdata_list_attributes or {}
-        if name in list_attr.get("*", []) or (
-            self.element.name in list_attr
-            and name in list_attr.get(self.element.name, [])
-        ):
-            # A node that is being cloned may have already undergone
-            # this procedure.
-            if not isinstance(value, list):
-                value = nonwhitespace_re.findall(value)
-        self.element[name] = value
+        return set(list_attr.get("*", ())).union(
+            list_attr.get(self.element.name, ()),
+        )
+
+    def set_many(self, items, multi_valued_names):
+        """Set several attributes, splitting the values of those named in
+        `multi_valued_names` (see `multi_valued_names()`) into lists.
+        """
+        element = self.element
+        for name, value in items:
+            # If this attribute is a multi-valued attribute for this element,
+            # turn its value into a list. A node that is being cloned may
+            # have already undergone this procedure.
+            if name in multi_valued_names and not isinstance(value, list):
+                value = _split_tokens(value)
+            element[name] = value
 
     def items(self):
-        return list(self.attrs.items())
+        return self.element.attrs.items()
 
     def keys(self):
-        return list(self.attrs.keys())
+        return self.element.attrs.keys()
 
     def __len__(self):
-        return len(self.attrs)
+        return len(self.element.attrs)
 
     def __getitem__(self, name):
-        return self.attrs[name]
+        return self.element.attrs[name]
 
     def __contains__(self, name):
-        return name in list(self.attrs.keys())
+        return name in self.element.attrs
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from html5lib.constants import namespaces
 from html5lib.treebuilders import base as treebuilder_base
 
@@ -9,16 +11,56 @@ from .attrs import AttrList
 __all__ = ["Element", "TextNode"]
 
 
+@lru_cache(maxsize=4096)
+def _namespaced_attribute(prefix, name, namespace):
+    """Create the NamespacedAttribute for an html5lib (prefix, name, namespace)
+    attribute key.
+
+    SVG and MathML documents repeat the same few namespaced attributes on
+    many tags, so these are shared between tags rather than revalidated
+    each time. Bisque never modifies an attribute name once it's created.
+    """
+    return NamespacedAttribute(prefix=prefix, name=name, namespace=namespace)
+
+
+def _flush_pending_text(soup):
+    """Materialize the text buffered on the soup's pending Element, if any.
+
+    Consecutive strings appended to the same Element are collected in its
+    `_pending_text` list rather than being merged one at a time, which has
+    O(n^2) performance for input like "a</a>a</a>a</a>...". Any other change
+    to the tree must call this first, so that the buffered text takes its
+    place as a single NavigableString.
+    """
+    element = soup.pending_text_element
+    if element is None:
+        return
+    soup.pending_text_element = None
+    soup.last_descendant_cache = None
+    pending = element._pending_text
+    element._pending_text = []
+    old_element = element.element.contents[-1]
+    new_element = soup.new_string("".join(pending))
+    old_element.replace_with(new_element)
+    soup.most_recent_element = new_element
+
+
 class Element(treebuilder_base.Node):
+    # treebuilder_base.Node has no __slots__, so instances still get a
+    # __dict__, but the attributes used on every insertion are slots.
+    __slots__ = ("element", "soup", "namespace", "parent", "_pending_text")
+
     def __init__(self, element, soup, namespace):
         treebuilder_base.Node.__init__(self, element.name)
         self.element = element
         self.soup = soup
         self.namespace = namespace
+        self._pending_text = []
 
     def appendChild(self, node):
         string_child = child = None
-        if isinstance(node, StrTypes):
+        node_is_string = type(node) is str or isinstance(node, StrTypes)
+        if node_is_string:
             # Some other piece of code decided to pass in a string
             # instead of creating a TextElement object to contain the
             # string.
@@ -28,73 +70,122 @@ class Element(treebuilder_base.Node):
             # instead of creating an Element object to contain the
             # Tag.
             child = node
-        elif node.element.__class__ == NavigableString:
+        elif type(node.element) is NavigableString:
             string_child = child = node.element
             node.parent = self
         else:
             child = node.element
             node.parent = self
 
+        soup = self.soup
+        if string_child is not None and soup.pending_text_element is self:
+            # We are appending a string onto text that is already buffered.
+            self._pending_text.append(str(string_child))
+            return
+
+        _flush_pending_text(soup)
+
         if not isinstance(child, StrTypes) and child.parent is not None:
             node.element.extract()
+            soup.last_descendant_cache = None
 
+        element = self.element
+        contents = element.contents
         if (
             string_child is not None
-            and self.element.contents
-            and self.element.contents[-1].__class__ == NavigableString
+            and contents
+            and type(contents[-1]) is NavigableString
         ):
-            # We are appending a string onto another string.
-            # TODO This has O(n^2) performance, for input like
-            # "a</a>a</a>a</a>..."
-            old_element = self.element.contents[-1]
-            new_element = self.soup.new_string(old_element + string_child)
-            old_element.replace_with(new_element)
-            self.soup.most_recent_element = new_element
+            # We are appending a string onto another string. Buffer both
+            # and create the combined string once the run of text ends.
+            self._pending_text = [str(contents[-1]), str(string_child)]
+            soup.pending_text_element = self
         else:
-            if isinstance(node, StrTypes):
+            if node_is_string:
                 # Create a brand new NavigableString from this string.
-                child = self.soup.new_string(node)
-
-            # Tell Bisque to act as if it parsed this element
-            # immediately after the parent's last descendant. (Or
-            # immediately after the parent, if it has no children.)
-            if self.element.contents:
-                most_recent_element = self.element._last_descendant(False)
-            elif self.element.next_element is not None:
-                # Something from further ahead in the parse tree is
-                # being inserted into this earlier element. This is
-                # very annoying because it means an expensive search
-                # for the last element in the tree.
-                most_recent_element = self.soup._last_descendant()
-            else:
-                most_recent_element = self.element
-
-            self.soup.object_was_parsed(
-                child,
-                parent=self.element,
-                most_recent_element=most_recent_element,
-            )
+                child = soup.new_string(node)
+            self._append_parsed(child)
+
+    def _append_parsed(self, child):
+        """Add a child after this element's last descendant, as though it
+        had just been parsed.
+        """
+        soup = self.soup
+        element = self.element
+
+        # Tell Bisque to act as if it parsed this element
+        # immediately after the parent's last descendant. (Or
+        # immediately after the parent, if it has no children.)
+        last_descendant = soup.last_descendant_cache
+        if element.contents:
+            most_recent_element = element._last_descendant(False)
+        elif element.next_element is not None:
+            # Something from further ahead in the parse tree is
+            # being inserted into this earlier element. This would
+            # mean a search for the last element in the tree, so
+            # use the cached one if it's still valid. Either way,
+            # the last element in the tree doesn't change.
+            if last_descendant is None:
+                last_descendant = soup._last_descendant()
+                soup.last_descendant_cache = last_descendant
+            most_recent_element = last_descendant
+            last_descendant = None
+        else:
+            most_recent_element = element
+
+        soup.object_was_parsed(
+            child,
+            parent=element,
+            most_recent_element=most_recent_element,
+        )
+        if last_descendant is not None and most_recent_element is last_descendant:
+            # We appended right after the last element in the tree,
+            # so the new child's last descendant takes its place.
+            soup.last_descendant_cache = child._last_descendant(False)
+
+    def _append_text_fast(self, data):
+        """Append a string of text, as appendChild would for a TextNode.
+
+        Text that is merged into a neighbouring string is buffered
+        without creating a NavigableString for it first.
+        """
+        soup = self.soup
+        container = soup.string_container()
+        if container is not NavigableString:
+            # Only plain NavigableStrings are merged with their neighbours.
+            self.appendChild(TextNode(container(data), soup))
+            return
+        if soup.pending_text_element is self:
+            self._pending_text.append(data)
+            return
+
+        _flush_pending_text(soup)
+
+        contents = self.element.contents
+        if contents and type(contents[-1]) is NavigableString:
+            self._pending_text = [str(contents[-1]), data]
+            soup.pending_text_element = self
+        else:
+            self._append_parsed(container(data))
 
     def getAttributes(self):
         if isinstance(self.element, Comment):
             return {}
-        return AttrList(self.element)
+        return AttrList(self.element, self.soup.builder)
 
     def setAttributes(self, attributes):
         if attributes is not None and len(attributes) > 0:
-            # converted_attributes = [] # never used? # mistake?
-            for name, value in list(attributes.items()):
+            converted_attributes = {}
+            for name, value in attributes.items():
                 if isinstance(name, tuple):
-                    new_name = NamespacedAttribute(*name)
-                    del attributes[name]
-                    attributes[new_name] = value
+                    name = _namespaced_attribute(*name)
+                converted_attributes[name] = value
 
-            self.soup.builder._replace_cdata_list_attribute_values(
-                self.name,
-                attributes,
+            attribute_list = AttrList(self.element, self.soup.builder)
+            attribute_list.set_many(
+                converted_attributes.items(),
+                attribute_list.multi_valued_names(),
             )
-            for name, value in list(attributes.items()):
-                self.element[name] = value
 
             # The attributes may contain variables that need substitution.
             # Call set_up_substitutions manually.
@@ -106,18 +197,20 @@ class Element(treebuilder_base.Node):
     attributes = property(getAttributes, setAttributes)
 
     def insertText(self, data, insertBefore=None):
-        text = TextNode(self.soup.new_string(data), self.soup)
         if insertBefore:
+            text = TextNode(self.soup.new_string(data), self.soup)
             self.insertBefore(text, insertBefore)
         else:
-            self.appendChild(text)
+            self._append_text_fast(data)
 
     def insertBefore(self, node, refNode):
+        _flush_pending_text(self.soup)
+        self.soup.last_descendant_cache = None
         index = self.element.index(refNode.element)
         if (
-            node.element.__class__ == NavigableString
+            type(node.element) is NavigableString
             and self.element.contents
-            and self.element.contents[index - 1].__class__ == NavigableString
+            and type(self.element.contents[index - 1]) is NavigableString
         ):
             # (See comments in appendChild)
             old_node = self.element.contents[index - 1]
@@ -128,6 +221,8 @@ class Element(treebuilder_base.Node):
             node.parent = self
 
     def removeChild(self, node):
+        _flush_pending_text(self.soup)
+        self.soup.last_descendant_cache = None
         node.element.extract()
 
     def reparentChildren(self, new_parent):
@@ -135,12 +230,19 @@ class Element(treebuilder_base.Node):
         # print("MOVE", self.element.contents)
         # print("FROM", self.element)
         # print("TO", new_parent.element)
-
         element = self.element
-        new_parent_element = new_parent.element
         # Determine what this tag's next_element will be once all the children
         # are removed.
         final_next_element = element.next_sibling
+        if not element.contents:
+            # There's nothing to move (and so no buffered text either).
+            element.next_element = final_next_element
+            return
+
+        _flush_pending_text(self.soup)
+        self.soup.last_descendant_cache = None
+
+        new_parent_element = new_parent.element
 
         new_parents_last_descendant = new_parent_element._last_descendant(False, False)
         if len(new_parent_element.contents) > 0:
@@ -156,43 +258,42 @@ class Element(treebuilder_base.Node):
             new_parents_last_descendant_next_element = new_parent_element.next_element
 
         to_append = element.contents
-        if len(to_append) > 0:
-            # Set the first child's previous_element and previous_sibling
-            # to elements within the new parent
-            first_child = to_append[0]
-            if new_parents_last_descendant is not None:
-                first_child.previous_element = new_parents_last_descendant
-            else:
-                first_child.previous_element = new_parent_element
-            first_child.previous_sibling = new_parents_last_child
-            if new_parents_last_descendant is not None:
-                new_parents_last_descendant.next_element = first_child
-            else:
-                new_parent_element.next_element = first_child
-            if new_parents_last_child is not None:
-                new_parents_last_child.next_sibling = first_child
-
-            # Find the very last element being moved. It is now the
-            # parent's last descendant. It has no .next_sibling and
-            # its .next_element is whatever the previous last
-            # descendant had.
-            last_childs_last_descendant = to_append[-1]._last_descendant(False, True)
-
-            last_childs_last_descendant.next_element = (
-                new_parents_last_descendant_next_element
+        # Set the first child's previous_element and previous_sibling
+        # to elements within the new parent
+        first_child = to_append[0]
+        if new_parents_last_descendant is not None:
+            first_child.previous_element = new_parents_last_descendant
+        else:
+            first_child.previous_element = new_parent_element
+        first_child.previous_sibling = new_parents_last_child
+        if new_parents_last_descendant is not None:
+            new_parents_last_descendant.next_element = first_child
+        else:
+            new_parent_element.next_element = first_child
+        if new_parents_last_child is not None:
+            new_parents_last_child.next_sibling = first_child
+
+        # Find the very last element being moved. It is now the
+        # parent's last descendant. It has no .next_sibling and
+        # its .next_element is whatever the previous last
+        # descendant had.
+        last_childs_last_descendant = to_append[-1]._last_descendant(False, True)
+
+        last_childs_last_descendant.next_element = (
+            new_parents_last_descendant_next_element
+        )
+        if new_parents_last_descendant_next_element is not None:
+            # TODO: This code has no test coverage and I'm not sure
+            # how to get html5lib to go through this path, but it's
+            # just the other side of the previous line.
+            new_parents_last_descendant_next_element.previous_element = (
+                last_childs_last_descendant
             )
-            if new_parents_last_descendant_next_element is not None:
-                # TODO: This code has no test coverage and I'm not sure
-                # how to get html5lib to go through this path, but it's
-                # just the other side of the previous line.
-                new_parents_last_descendant_next_element.previous_element = (
-                    last_childs_last_descendant
-                )
-            last_childs_last_descendant.next_sibling = None
+        last_childs_last_descendant.next_sibling = None
 
         for child in to_append:
             child.parent = new_parent_element
-            new_parent_element.contents.append(child)
+        new_parent_element.contents.extend(to_append)
 
         # Now that this element has no children, change its .next_element.
         element.contents = []
@@ -222,10 +323,13 @@ class Element(treebuilder_base.Node):
 
 
 class TextNode(Element):
+    __slots__ = ()
+
     def __init__(self, element, soup):
         treebuilder_base.Node.__init__(self, None)
         self.element = element
         self.soup = soup
+        self._pending_text = []
 
     def cloneNode(self):
         raise NotImplementedError
@@ -70,25 +70,35 @@ class HTML5TreeBuilder(HTMLTreeBuilder):
         parser = html5lib.HTMLParser(tree=self.create_treebuilder)
         self.underlying_builder.parser = parser
         extra_kwargs = dict()
-        if not isinstance(markup, StrTypes):
+        markup_is_string = type(markup) is str or isinstance(markup, StrTypes)
+        if not markup_is_string:
             extra_kwargs["override_encoding"] = self.user_specified_encoding
         doc = parser.parse(markup, **extra_kwargs)
 
         # Set the character encoding detected by the tokenizer.
-        if isinstance(markup, StrTypes):
+        if markup_is_string:
             # We need to special-case this because html5lib sets
             # charEncoding to UTF-8 if it gets Unicode input.
             doc.original_encoding = None
         else:
-            original_encoding = parser.tokenizer.stream.charEncoding[0]
-            if not isinstance(original_encoding, StrTypes):
-                # In 0.99999999 and up, the encoding is an html5lib
-                # Encoding object. We want to use a string for compatibility
-                # with other tree builders.
-                original_encoding = original_encoding.name
-            doc.original_encoding = original_encoding
+            doc.original_encoding = self._extract_original_encoding(parser)
         self.underlying_builder.parser = None
 
+    @staticmethod
+    def _extract_original_encoding(parser):
+        """Find the name of the encoding html5lib's tokenizer settled on.
+
+        :param parser: The html5lib HTMLParser that parsed the document.
+        :return: The encoding name as a string.
+        """
+        encoding = parser.tokenizer.stream.charEncoding[0]
+        if type(encoding) is str:
+            return encoding
+        # In 0.99999999 and up, the encoding is an html5lib Encoding
+        # object. We want to use a string for compatibility with other
+        # tree builders.
+        return encoding.name
+
     def create_treebuilder(self, namespaceHTMLElements):
         self.underlying_builder = TreeBuilderForHtml5lib(
             namespaceHTMLElements,
@@ -5,10 +5,12 @@ from html5lib.treebuilders import base as treebuilder_base
 
 from bisque.element import Comment, Doctype, NamespacedAttribute, NavigableString
 
-from .element_and_text import Element, TextNode
+from .element_and_text import Element, TextNode, _flush_pending_text
 
 __all__ = ["TreeBuilderForHtml5lib"]
 
+doctype_re = re.compile(r'^(.*?)(?: PUBLIC "(.*?)"(?: "(.*?)")?| SYSTEM "(.*?)")?$')
+
 
 class TreeBuilderForHtml5lib(treebuilder_base.TreeBuilder):
     def __init__(
@@ -48,19 +50,26 @@ class TreeBuilderForHtml5lib(treebuilder_base.TreeBuilder):
         name = token["name"]
         publicId = token["publicId"]
         systemId = token["systemId"]
+        _flush_pending_text(self.soup)
+        self.soup.last_descendant_cache = None
         doctype = Doctype.for_name_and_ids(name, publicId, systemId)
         self.soup.object_was_parsed(doctype)
 
     def elementClass(self, name, namespace):
-        kwargs = {}
-        if self.parser and self.store_line_numbers:
+        parser = self.parser
+        if parser is not None and self.store_line_numbers:
             # This represents the point immediately after the end of the
             # tag. We don't know when the tag started, but we do know
             # where it ended -- the character just before this one.
-            sourceline, sourcepos = self.parser.tokenizer.stream.position()
-            kwargs["sourceline"] = sourceline
-            kwargs["sourcepos"] = sourcepos - 1
-        tag = self.soup.new_tag(name, namespace, **kwargs)
+            sourceline, sourcepos = parser.tokenizer.stream.position()
+            tag = self.soup.new_tag(
+                name,
+                namespace,
+                sourceline=sourceline,
+                sourcepos=sourcepos - 1,
+            )
+        else:
+            tag = self.soup.new_tag(name, namespace)
         return Element(tag, self.soup, namespace)
 
     def commentClass(self, data):
@@ -77,60 +86,64 @@ class TreeBuilderForHtml5lib(treebuilder_base.TreeBuilder):
 
     def appendChild(self, node):
         # XXX This code is not covered by the BS4 tests.
+        _flush_pending_text(self.soup)
+        self.soup.last_descendant_cache = None
         self.soup.append(node.element)
 
     def getDocument(self):
+        _flush_pending_text(self.soup)
+        self.soup.last_descendant_cache = None
         return self.soup
 
     def getFragment(self):
+        _flush_pending_text(self.soup)
+        self.soup.last_descendant_cache = None
         return treebuilder_base.TreeBuilder.getFragment(self).element
 
     def testSerializer(self, element):
         from bisque import Bisque
 
         rv = []
-        doctype_re = re.compile(
-            r'^(.*?)(?: PUBLIC "(.*?)"(?: "(.*?)")?| SYSTEM "(.*?)")?$',
-        )
 
         def serializeElement(element, indent=0):
+            pad = " " * indent
             if isinstance(element, Bisque):
                 pass
             if isinstance(element, Doctype):
-                m = doctype_re.match(element)
+                m = doctype_re.match(str(element))
                 if m:
                     name = m.group(1)
                     if m.lastindex > 1:
                         publicId = m.group(2) or ""
                         systemId = m.group(3) or m.group(4) or ""
                         rv.append(
-                            """|%s<!DOCTYPE %s "%s" "%s">"""
-                            % (" " * indent, name, publicId, systemId),
+                            f'|{pad}<!DOCTYPE {name} "{publicId}" "{systemId}">',
                         )
                     else:
-                        rv.append("|{}<!DOCTYPE {}>".format(" " * indent, name))
+                        rv.append(f"|{pad}<!DOCTYPE {name}>")
                 else:
-                    rv.append("|{}<!DOCTYPE >".format(" " * indent))
+                    rv.append(f"|{pad}<!DOCTYPE >")
             elif isinstance(element, Comment):
-                rv.append("|{}<!-- {} -->".format(" " * indent, element))
+                rv.append(f"|{pad}<!-- {element} -->")
             elif isinstance(element, NavigableString):
-                rv.append('|{}"{}"'.format(" " * indent, element))
+                rv.append(f'|{pad}"{element}"')
             else:
                 if element.namespace:
                     name = f"{prefixes[element.namespace]} {element.name}"
                 else:
                     name = element.name
-                rv.append("|{}<{}>".format(" " * indent, name))
+                rv.append(f"|{pad}<{name}>")
                 if element.attrs:
                     attributes = []
-                    for name, value in list(element.attrs.items()):
+                    for name, value in element.attrs.items():
                         if isinstance(name, NamespacedAttribute):
                             name = f"{prefixes[name.namespace]} {name.name}"
                         if isinstance(value, list):
                             value = " ".join(value)
                         attributes.append((name, value))
-                    for name, value in sorted(attributes):
-                        rv.append('|{}{}="{}"'.format(" " * (indent + 2), name, value))
+                    attributes.sort()
+                    for name, value in attributes:
+                        rv.append(f'|{pad}  {name}="{value}"')
                 indent += 2
                 for child in element.children:
                     serializeElement(child, indent)
@@ -25,6 +25,8 @@ class HTMLTreeBuilder(TreeBuilder):
     Such as which tags are empty-element tags.
     """
 
+    __slots__ = ()
+
     empty_element_tags = {
         # These are from HTML5.
         "area",
@@ -154,9 +156,8 @@ class HTMLTreeBuilder(TreeBuilder):
         # We are only interested in <meta> tags
         if tag.name != "meta":
             return False
-        http_equiv = tag.get("http-equiv")
-        content = tag.get("content")
-        charset = tag.get("charset")
+        attrs = tag.attrs
+        charset = attrs.get("charset")
         # We are interested in <meta> tags that say what encoding the
         # document was originally in. This means HTML 5-style <meta>
         # tags that provide the "charset" attribute. It also means
@@ -166,18 +167,23 @@ class HTMLTreeBuilder(TreeBuilder):
         # In both cases we will replace the value of the appropriate
         # attribute with a standin object that can take on any
         # encoding.
-        meta_encoding = None
         if charset is not None:
             # HTML 5 style:
             # <meta charset="utf8">
-            meta_encoding = charset
             tag["charset"] = CharsetMetaAttributeValue(original_value=charset)
-        elif (
-            content is not None
-            and http_equiv is not None
+            return True
+        content = attrs.get("content")
+        if content is None:
+            return False
+        http_equiv = attrs.get("http-equiv")
+        # Checking the length first avoids lowercasing (and so copying)
+        # other http-equiv values, such as "refresh".
+        if (
+            http_equiv is not None
+            and len(http_equiv) == len("content-type")
             and http_equiv.lower() == "content-type"
         ):
             # HTML 4 style:
             # <meta http-equiv="content-type" content="text/html; charset=utf8">
-            tag["content"] = ContentMetaAttributeValue(original_value=content)
-        return meta_encoding is not None
+            tag["content"] = ContentMetaAttributeValue.create(content)
+        return False
@@ -2,8 +2,10 @@
 The main class `TreeBuilder` is a base for the `HTMLBuilder` which is then specified at
 the parser level for the stdlib HTML parser, the HTML5lib parser, and the lxml parser.
 
-`TreeBuilder` sets 9 methods:
+`TreeBuilder` sets 11 methods:
 - `__init__`
+- `_index_cdata_list_attributes`
+- `cdata_list_attributes_for`
 - `initialize_soup`
 - `reset`
 - `can_be_empty_element`
@@ -27,10 +29,6 @@ and 5 class variables
 - `TRACKS_LINE_NUMBERS`
 """
 
-from collections import defaultdict
-
-from bisque.element import nonwhitespace_re
-
 from .parser_names import INIT
 
 __all__ = ["TreeBuilder", "ParserRejectedMarkup"]
@@ -49,7 +47,7 @@ class TreeBuilder:
     empty_element_tags = None
     # A value for these tag/attribute combinations is a space- or
     # comma-separated list of CDATA, rather than a single CDATA.
-    DEFAULT_CDATA_LIST_ATTRIBUTES = defaultdict(list)
+    DEFAULT_CDATA_LIST_ATTRIBUTES = {}
     # Whitespace should be preserved inside these tags.
     DEFAULT_PRESERVE_WHITESPACE_TAGS = set()
     # The textual contents of tags with these names should be
@@ -59,6 +57,22 @@ class TreeBuilder:
     # Most parsers don't keep track of line numbers.
     TRACKS_LINE_NUMBERS = False
 
+    # Subclasses that don't declare __slots__ of their own still get a
+    # __dict__ for any further attributes they set.
+    __slots__ = (
+        "soup",
+        "_cdata_list_attributes",
+        "_universal_cdata_list_attributes",
+        "_cdata_list_attributes_by_tag",
+        "_has_cdata_list_attributes",
+        "_cdata_list_attributes_by_raw_name",
+        "_last_cdata_list_attributes_tag_name",
+        "_last_cdata_list_attributes",
+        "preserve_whitespace_tags",
+        "store_line_numbers",
+        "string_containers",
+    )
+
     def __init__(
         self,
         multi_valued_attributes=USE_DEFAULT,
@@ -98,19 +112,84 @@ class TreeBuilder:
          will do nothing.
         """
         self.soup = None
-        if multi_valued_attributes is self.USE_DEFAULT:
+        use_default = self.USE_DEFAULT
+        if multi_valued_attributes is use_default:
             multi_valued_attributes = self.DEFAULT_CDATA_LIST_ATTRIBUTES
         self.cdata_list_attributes = multi_valued_attributes
-        if preserve_whitespace_tags is self.USE_DEFAULT:
+        if preserve_whitespace_tags is use_default:
             preserve_whitespace_tags = self.DEFAULT_PRESERVE_WHITESPACE_TAGS
         self.preserve_whitespace_tags = preserve_whitespace_tags
-        if store_line_numbers == self.USE_DEFAULT:
+        if store_line_numbers is use_default:
             store_line_numbers = self.TRACKS_LINE_NUMBERS
         self.store_line_numbers = store_line_numbers
-        if string_containers == self.USE_DEFAULT:
+        if string_containers is use_default:
             string_containers = self.DEFAULT_STRING_CONTAINERS
         self.string_containers = string_containers
 
+    @property
+    def cdata_list_attributes(self):
+        """A dictionary mapping tag names (or "*" for every tag) to the
+        names of their multi-valued attributes.
+
+        Assigning a new value rebuilds the lookup tables used by
+        cdata_list_attributes_for(). Changes made to the dictionary in
+        place are not seen; assign it again to pick them up.
+        """
+        return self._cdata_list_attributes
+
+    @cdata_list_attributes.setter
+    def cdata_list_attributes(self, cdata_list_attributes):
+        self._cdata_list_attributes = cdata_list_attributes
+        (
+            self._universal_cdata_list_attributes,
+            self._cdata_list_attributes_by_tag,
+        ) = self._index_cdata_list_attributes(cdata_list_attributes)
+        self._has_cdata_list_attributes = bool(
+            self._universal_cdata_list_attributes or self._cdata_list_attributes_by_tag,
+        )
+        # Maps tag names, as the parser reports them, to the result of
+        # cdata_list_attributes_for() on their lowercased form.
+        self._cdata_list_attributes_by_raw_name = {}
+        # The most recent entry used from that table, since runs of
+        # same-named tags (<li>, <td>, <tr>) are common.
+        self._last_cdata_list_attributes_tag_name = None
+        self._last_cdata_list_attributes = None
+
+    @staticmethod
+    def _index_cdata_list_attributes(cdata_list_attributes):
+        """Precompute the multi-valued attribute names for each tag.
+
+        :param cdata_list_attributes: A dictionary mapping tag names (or
+           "*" for every tag) to the names of their multi-valued attributes.
+        :return: A 2-tuple (universal, by_tag): the frozenset of names that
+           apply to every tag, and a dictionary mapping each tag with its
+           own entry to the frozenset of names that apply to it.
+        """
+
+        def names(value):
+            return frozenset((value,) if isinstance(value, str) else value)
+
+        if not cdata_list_attributes:
+            return frozenset(), {}
+        universal = names(cdata_list_attributes.get("*", ()))
+        by_tag = {
+            tag_name: universal | names(attribute_names)
+            for tag_name, attribute_names in cdata_list_attributes.items()
+            if tag_name != "*"
+        }
+        return universal, by_tag
+
+    def cdata_list_attributes_for(self, tag_name):
+        """Which attributes of a tag with this name are multi-valued?
+
+        :param tag_name: The name of a markup tag.
+        :return: A frozenset of attribute names.
+        """
+        return self._cdata_list_attributes_by_tag.get(
+            tag_name,
+            self._universal_cdata_list_attributes,
+        )
+
     def initialize_soup(self, soup):
         """The Bisque object has been initialized and is now
         being associated with the TreeBuilder.
@@ -234,28 +313,38 @@ class TreeBuilder:
         :param attrs: A dictionary containing the tag's attributes.
            Any appropriate attribute values will be modified in place.
         """
-        if not attrs:
+        if not attrs or not self._has_cdata_list_attributes:
+            return attrs
+        if tag_name == self._last_cdata_list_attributes_tag_name:
+            multi_valued_names = self._last_cdata_list_attributes
+        else:
+            try:
+                multi_valued_names = self._cdata_list_attributes_by_raw_name[tag_name]
+            except KeyError:
+                multi_valued_names = self.cdata_list_attributes_for(tag_name.lower())
+                self._cdata_list_attributes_by_raw_name[tag_name] = multi_valued_names
+            self._last_cdata_list_attributes_tag_name = tag_name
+            self._last_cdata_list_attributes = multi_valued_names
+        if multi_valued_names.isdisjoint(attrs):
+            # The common case: none of this tag's attributes are
+            # multi-valued. isdisjoint() answers that without building
+            # the intersection.
             return attrs
-        if self.cdata_list_attributes:
-            universal = self.cdata_list_attributes.get("*", [])
-            tag_specific = self.cdata_list_attributes.get(tag_name.lower(), None)
-            for attr in list(attrs.keys()):
-                if attr in universal or (tag_specific and attr in tag_specific):
-                    # We have a "class"-type attribute whose string
-                    # value is a whitespace-separated list of
-                    # values. Split it into a list.
-                    value = attrs[attr]
-                    if isinstance(value, str):
-                        values = nonwhitespace_re.findall(value)
-                    else:
-                        # html5lib sometimes calls setAttributes twice
-                        # for the same tag when rearranging the parse
-                        # tree. On the second call the attribute value
-                        # here is already a list.  If this happens,
-                        # leave the value alone rather than trying to
-                        # split it again.
-                        values = value
-                    attrs[attr] = values
+        for attr in attrs.keys() & multi_valued_names:
+            # We have a "class"-type attribute whose string
+            # value is a whitespace-separated list of
+            # values. Split it into a list.
+            value = attrs[attr]
+            if isinstance(value, str):
+                # html5lib sometimes calls setAttributes twice for the
+                # same tag when rearranging the parse tree. On the
+                # second call the attribute value here is already a
+                # list. If this happens, leave the value alone rather
+                # than trying to split it again.
+                # str.split() splits on exactly the characters
+                # nonwhitespace_re treats as whitespace, without going
+                # through the regex engine.
+                attrs[attr] = str.split(value)
         return attrs
 
 
@@ -8,9 +8,12 @@ class TreeBuilderRegistry:
     features.
     """
 
+    __slots__ = ("builders_for_feature", "builders", "features_of_builder")
+
     def __init__(self):
         self.builders_for_feature = defaultdict(list)
         self.builders = []
+        self.features_of_builder = {}
 
     def register(self, treebuilder_class):
         """Register a treebuilder based on its advertised features.
@@ -21,6 +24,9 @@ class TreeBuilderRegistry:
         for feature in treebuilder_class.features:
             self.builders_for_feature[feature].insert(0, treebuilder_class)
         self.builders.insert(0, treebuilder_class)
+        self.features_of_builder[treebuilder_class] = frozenset(
+            treebuilder_class.features,
+        )
 
     def lookup(self, *features):
         """Look up a TreeBuilder subclass with the desired features.
@@ -31,38 +37,22 @@ class TreeBuilderRegistry:
         :return: A TreeBuilder subclass, or None if there's no
             registered subclass with all the requested features.
         """
-        if len(self.builders) == 0:
+        if not self.builders:
             # There are no builders at all.
             return None
 
-        if len(features) == 0:
+        if not features:
             # They didn't ask for any features. Give them the most
             # recently registered builder.
             return self.builders[0]
 
-        # Go down the list of features in order, and eliminate any builders
-        # that don't match every feature.
-        features = list(features)
-        features.reverse()
-        candidates = None
-        candidate_set = None
-        while len(features) > 0:
-            feature = features.pop()
-            we_have_the_feature = self.builders_for_feature.get(feature, [])
-            if len(we_have_the_feature) > 0:
-                if candidates is None:
-                    candidates = we_have_the_feature
-                    candidate_set = set(candidates)
-                else:
-                    # Eliminate any candidates that don't have this feature.
-                    candidate_set = candidate_set.intersection(set(we_have_the_feature))
-
-        # The only valid candidates are the ones in candidate_set.
-        # Go through the original list of candidates and pick the first one
-        # that's in candidate_set.
-        if candidate_set is None:
+        # Features that no registered builder advertises are ignored.
+        required = self.builders_for_feature.keys() & features
+        if not required:
             return None
-        for candidate in candidates:
-            if candidate in candidate_set:
+        # The builders are ordered most recently registered first, so the
+        # first one that has every required feature is the one we want.
+        for candidate in self.builders:
+            if required <= self.features_of_builder[candidate]:
                 return candidate
         return None
@@ -17,7 +17,7 @@ class SAXTreeBuilder(TreeBuilder):
         pass
 
     def startElement(self, name, attrs):
-        attrs = {key[1]: value for key, value in list(attrs.items())}
+        attrs = {key[1]: value for key, value in attrs.items()}
         # print("Start %s, %r" % (name, attrs))
         self.soup.handle_starttag(name, attrs)
 
@@ -23,8 +23,14 @@ class DetectsXMLParsedAsHTML:
     observe tags as they're opened. If you can't do that for a given
     TreeBuilder, there's a less reliable implementation based on
     examining the raw markup.
+
+    This mixin declares empty __slots__, so it can be combined with
+    TreeBuilder, which has slots of its own. The detector's state is
+    kept in the __dict__ of the concrete class.
     """
 
+    __slots__ = ()
+
     # Regular expression for seeing if markup has an <html> tag.
     LOOKS_LIKE_HTML = re.compile("<[^ +]html", re.I)
     LOOKS_LIKE_HTML_B = re.compile(b"<[^ +]html", re.I)
@@ -32,6 +38,13 @@ class DetectsXMLParsedAsHTML:
     XML_PREFIX = "<?xml"
     XML_PREFIX_B = b"<?xml"
 
+    # The XML prefix and the bound search() method of the <html>
+    # regular expression, keyed by the type of markup they apply to.
+    _XML_DETECTORS = {
+        str: (XML_PREFIX, LOOKS_LIKE_HTML.search),
+        bytes: (XML_PREFIX_B, LOOKS_LIKE_HTML_B.search),
+    }
+
     @classmethod
     def warn_if_markup_looks_like_xml(cls, markup):
         """Perform a check on some markup to see if it looks like XML
@@ -43,18 +56,14 @@ class DetectsXMLParsedAsHTML:
         :return: True if the markup looks like non-XHTML XML, False
         otherwise.
         """
-        if isinstance(markup, bytes):
-            prefix = cls.XML_PREFIX_B
-            looks_like_html = cls.LOOKS_LIKE_HTML_B
-        else:
-            prefix = cls.XML_PREFIX
-            looks_like_html = cls.LOOKS_LIKE_HTML
-
-        if (
-            markup is not None
-            and markup.startswith(prefix)
-            and not looks_like_html.search(markup[:500])
-        ):
+        detector = cls._XML_DETECTORS.get(type(markup))
+        if detector is None:
+            # Not exactly str or bytes; maybe a subclass.
+            if markup is None:
+                return False
+            detector = cls._XML_DETECTORS[bytes if isinstance(markup, bytes) else str]
+        prefix, search_looks_like_html = detector
+        if markup.startswith(prefix) and not search_looks_like_html(markup, 0, 500):
             cls._warn()
             return True
         return False
@@ -1,14 +1,53 @@
 """Integration code for CSS selectors using Chinois (pypi: chinois)."""
 
+import re
 import warnings
+from functools import lru_cache
 
 try:
     import chinois
+    from chinois.css_match import CSSMatch
 except ImportError:
     chinois = None
-    warnings.warn(
-        "The chinois package is not installed. CSS selectors cannot be used.",
-    )
+    CSSMatch = None
+
+# Whether the missing-chinois warning has been issued yet. It's put off
+# until CSS is used, so that importing this module costs nothing extra
+# for code that never touches CSS selectors.
+_warned_missing_chinois = False
+
+
+def _warn_missing_chinois():
+    """Warn, once per process, that chinois is not installed."""
+    global _warned_missing_chinois
+    if not _warned_missing_chinois:
+        _warned_missing_chinois = True
+        warnings.warn(
+            "The chinois package is not installed. CSS selectors cannot be used.",
+            stacklevel=3,
+        )
+
+
+# A selector made of nothing but an ASCII type selector, like "div".
+_TYPE_SELECTOR_RE = re.compile(r"[a-zA-Z][a-zA-Z0-9_-]*")
+
+
+@lru_cache(maxsize=512)
+def _compile_cached(api, select, namespaces, flags):
+    """Compile a selector string, reusing the result for repeat calls.
+
+    This lives at module level, not on CSS, so the compiled selectors
+    are shared by every CSS object in the process.
+
+    :param api: The chinois module, or a plug-in replacement for it.
+    :param select: A CSS selector string.
+    :param namespaces: A frozenset of (prefix, URI) pairs, or None.
+    :param flags: Flags to be passed into chinois.compile().
+    :return: A precompiled selector object.
+    """
+    if namespaces is not None:
+        namespaces = dict(namespaces)
+    return api.compile(select, namespaces, flags)
 
 
 class CSS:
@@ -24,6 +63,10 @@ class CSS:
     calls, since it's already scoped to a tag.
     """
 
+    # Tag.css makes a new CSS object every time it's accessed, so keep
+    # construction cheap.
+    __slots__ = ("api", "tag", "_tag_namespaces")
+
     def __init__(self, tag, api=chinois):
         """Constructor.
 
@@ -39,32 +82,160 @@ class CSS:
         designed mainly for use in tests.
         """
         if api is None:
+            _warn_missing_chinois()
             raise NotImplementedError(
                 "Cannot execute CSS selectors because the chinois package is not installed.",
             )
         self.api = api
         self.tag = tag
-
-    def escape(self, ident):
-        """Escape a CSS identifier.
-
-        This is a simple wrapper around soupselect.escape(). See the
-        documentation for that function for more information.
-        """
-        if chinois is None:
+        # Builders add to a tag's namespaces in place, so holding on to
+        # the dict keeps up with them. Replacing tag.namespaces with a
+        # new dict won't be picked up by an existing CSS object.
+        self._tag_namespaces = tag.namespaces
+
+    # Whether chinois is installed is settled at import time, so pick
+    # the right escape() once here rather than checking on every call.
+    if chinois is None:
+
+        def escape(self, ident):
+            """Escape a CSS identifier.
+
+            chinois is not installed, so this always raises
+            NotImplementedError.
+            """
+            _warn_missing_chinois()
             raise NotImplementedError(
                 "Cannot escape CSS identifiers because the chinois package is not installed.",
             )
-        return self.api.escape(ident)
+
+    else:
+
+        def escape(self, ident):
+            """Escape a CSS identifier.
+
+            This is a simple wrapper around soupselect.escape(). See the
+            documentation for that function for more information.
+            """
+            return self.api.escape(ident)
 
     def _ns(self, ns, select):
         """Normalize a dictionary of namespaces."""
-        if not isinstance(select, self.api.SoupSieve) and ns is None:
+        if ns is not None:
+            return ns
+        if type(select) is str:
+            # The common case, settled without an isinstance() check.
+            return self._tag_namespaces
+        if isinstance(select, self.api.SoupSieve):
             # If the selector is a precompiled pattern, it already has
             # a namespace context compiled in, which cannot be
             # replaced.
-            ns = self.tag.namespaces
-        return ns
+            return None
+        return self._tag_namespaces
+
+    def _compiled(self, select, namespaces, flags, kwargs):
+        """Compile a selector string through the module-level cache.
+
+        :return: The compiled selector, with its namespaces and flags
+           compiled in, or None if the selector can't be cached: it's
+           already compiled, or the call has extra keyword arguments
+           such as custom=.
+        """
+        if kwargs or not isinstance(select, str):
+            return None
+        namespaces = self._ns(namespaces, select)
+        if namespaces is not None:
+            namespaces = frozenset(namespaces.items())
+        return _compile_cached(self.api, select, namespaces, flags)
+
+    def _type_selector(self, select, namespaces, flags, kwargs):
+        """Is this a selector select() can run without chinois?
+
+        That's a bare type selector like "div", run against an HTML
+        document with the default flags, no extra keyword arguments and
+        no default namespace. chinois would then match every tag whose
+        ASCII-lowercased name equals the lowercased selector.
+
+        :return: The lowercased tag name to look for, or None.
+        """
+        if (
+            self.api is not chinois
+            or flags
+            or kwargs
+            or not isinstance(select, str)
+            or self.tag._is_xml
+            or _TYPE_SELECTOR_RE.fullmatch(select) is None
+            or "" in self._ns(namespaces, select)
+        ):
+            return None
+        return select.lower()
+
+    def _select_by_type(self, name, limit):
+        """Find the descendant Tags matching a type selector.
+
+        :param name: A lowercased tag name, from _type_selector().
+        :param limit: After finding this number of results, stop looking.
+        :return: A list of Tags, in document order.
+        """
+        tag_class = self.tag.TYPE_TABLE.Tag
+        results = []
+        for el in self.tag.descendants:
+            if not isinstance(el, tag_class):
+                continue
+            el_name = el.name
+            if el_name == name or (el_name.isascii() and el_name.lower() == name):
+                results.append(el)
+                if len(results) == limit:
+                    break
+        return results
+
+    @classmethod
+    def precompile(cls, select, namespaces=None, flags=0, **kwargs):
+        """Compile a selector without reference to any particular Tag.
+
+        Unlike compile(), this doesn't fill in the namespace prefixes
+        a Tag's document was parsed with, so the result can be reused
+        across Tags from any document. Any prefixes the selector uses
+        must be passed in explicitly. Selector strings share the cache
+        compile() uses.
+
+        :param select: A CSS selector.
+
+        :param namespaces: A dictionary mapping namespace prefixes
+           used in the CSS selector to namespace URIs.
+
+        :param flags: Flags to be passed into Chinois's
+            chinois.compile() method.
+
+        :param kwargs: Keyword arguments to be passed into SoupSieve's
+           chinois.compile() method.
+
+        :return: A precompiled selector object.
+        :rtype: chinois.SoupSieve
+        """
+        if chinois is None:
+            _warn_missing_chinois()
+            raise NotImplementedError(
+                "Cannot compile CSS selectors because the chinois package is not installed.",
+            )
+        if kwargs or not isinstance(select, str):
+            return chinois.compile(select, namespaces, flags, **kwargs)
+        if namespaces is not None:
+            namespaces = frozenset(namespaces.items())
+        return _compile_cached(chinois, select, namespaces, flags)
+
+    @staticmethod
+    def cache_info():
+        """Report on the cache of compiled selector strings.
+
+        :return: A named tuple, as returned by functools.lru_cache's
+           cache_info().
+        """
+        return _compile_cached.cache_info()
+
+    @staticmethod
+    def cache_clear():
+        """Empty the cache of compiled selector strings."""
+        _compile_cached.cache_clear()
 
     def _rs(self, results):
         """Normalize a list of results to a Resultset.
@@ -74,10 +245,9 @@ class CSS:
         message if you try to treat a list of results as a single
         result (a common mistake).
         """
-        # Import here to avoid circular import
-        from bisque.element import ResultSet
-
-        return ResultSet(None, results)
+        # The tag's type table saves importing ResultSet here, which
+        # would be circular.
+        return self.tag.TYPE_TABLE.ResultSet(None, results)
 
     def compile(self, select, namespaces=None, flags=0, **kwargs):
         """Pre-compile a selector and return the compiled object.
@@ -98,6 +268,9 @@ class CSS:
         :return: A precompiled selector object.
         :rtype: chinois.SoupSieve
         """
+        compiled = self._compiled(select, namespaces, flags, kwargs)
+        if compiled is not None:
+            return compiled
         return self.api.compile(select, self._ns(namespaces, select), flags, **kwargs)
 
     def select_one(self, select, namespaces=None, flags=0, **kwargs):
@@ -125,13 +298,17 @@ class CSS:
         :rtype: bisque.element.Tag
 
         """
-        return self.api.select_one(
-            select,
-            self.tag,
-            self._ns(namespaces, select),
-            flags,
-            **kwargs,
-        )
+        name = self._type_selector(select, namespaces, flags, kwargs)
+        if name is not None:
+            results = self._select_by_type(name, 1)
+            return results[0] if results else None
+        compiled = self._compiled(select, namespaces, flags, kwargs)
+        if compiled is not None:
+            # SoupSieve.select_one() lists the results of a limit=1
+            # iselect(); take the one result straight from the generator.
+            return next(compiled.iselect(self.tag, 1), None)
+        namespaces = self._ns(namespaces, select)
+        return self.api.select_one(select, self.tag, namespaces, flags, **kwargs)
 
     def select(self, select, namespaces=None, limit=0, flags=0, **kwargs):
         """Perform a CSS selection operation on the current Tag.
@@ -162,17 +339,96 @@ class CSS:
         if limit is None:
             limit = 0
 
+        name = self._type_selector(select, namespaces, flags, kwargs)
+        if name is not None:
+            return self._rs(self._select_by_type(name, limit))
+        # ResultSet builds its own list, so take the results from
+        # iselect() rather than having select() build one first.
+        compiled = self._compiled(select, namespaces, flags, kwargs)
+        if compiled is not None:
+            return self._rs(compiled.iselect(self.tag, limit))
+        namespaces = self._ns(namespaces, select)
         return self._rs(
-            self.api.select(
-                select,
-                self.tag,
-                self._ns(namespaces, select),
-                limit,
-                flags,
-                **kwargs,
-            ),
+            self.api.iselect(select, self.tag, namespaces, limit, flags, **kwargs),
         )
 
+    def select_union(self, selects, namespaces=None, limit=0, flags=0, **kwargs):
+        """Find every Tag matching any of several CSS selectors, in a
+        single pass over the tree.
+
+        The selectors are joined into one selector list, so each
+        matching Tag appears once, and results are in document order
+        rather than grouped by selector.
+
+        :param selects: A list of strings containing CSS selectors.
+
+        :param namespaces: A dictionary mapping namespace prefixes
+            used in the CSS selectors to namespace URIs. By default,
+            Bisque will pass in the prefixes it encountered while
+            parsing the document.
+
+        :param limit: After finding this number of results, stop looking.
+
+        :param flags: Flags to be passed into Chinois's
+            chinois.select() method.
+
+        :param kwargs: Keyword arguments to be passed into SoupSieve's
+            chinois.select() method.
+
+        :return: A ResultSet of Tag objects.
+        :rtype: bisque.element.ResultSet
+        """
+        if not selects:
+            return self._rs([])
+        return self.select(", ".join(selects), namespaces, limit, flags, **kwargs)
+
+    def select_partitioned(self, selects, namespaces=None, flags=0, **kwargs):
+        """Find the Tags matching each of several CSS selectors, in a
+        single pass over the tree.
+
+        This runs select_union() once, then sorts its results by
+        matching each one against the individual selectors.
+
+        :param selects: A list of strings containing CSS selectors.
+
+        :param namespaces: A dictionary mapping namespace prefixes
+            used in the CSS selectors to namespace URIs. By default,
+            Bisque will pass in the prefixes it encountered while
+            parsing the document.
+
+        :param flags: Flags to be passed into Chinois's
+            chinois.select() method.
+
+        :param kwargs: Keyword arguments to be passed into SoupSieve's
+            chinois.select() method.
+
+        :return: A dictionary mapping each selector to a ResultSet of the
+            Tag objects it matches, in document order.
+        :rtype: dict
+        """
+        if self.api is not chinois:
+            return {
+                select: self.select(select, namespaces, 0, flags, **kwargs)
+                for select in selects
+            }
+        # Match with this Tag as the :scope, as select() does; a compiled
+        # pattern's own match() would make each candidate its own :scope.
+        matchers = {}
+        for select in selects:
+            compiled = self.compile(select, namespaces, flags, **kwargs)
+            matchers[select] = CSSMatch(
+                compiled.selectors,
+                self.tag,
+                compiled.namespaces,
+                compiled.flags,
+            ).match
+        partitioned = {select: [] for select in matchers}
+        for tag in self.select_union(selects, namespaces, 0, flags, **kwargs):
+            for select, match in matchers.items():
+                if match(tag):
+                    partitioned[select].append(tag)
+        return {select: self._rs(tags) for select, tags in partitioned.items()}
+
     def iselect(self, select, namespaces=None, limit=0, flags=0, **kwargs):
         """Perform a CSS selection operation on the current Tag.
 
@@ -199,14 +455,11 @@ class CSS:
         :return: A generator
         :rtype: types.GeneratorType
         """
-        return self.api.iselect(
-            select,
-            self.tag,
-            self._ns(namespaces, select),
-            limit,
-            flags,
-            **kwargs,
-        )
+        compiled = self._compiled(select, namespaces, flags, kwargs)
+        if compiled is not None:
+            return compiled.iselect(self.tag, limit)
+        namespaces = self._ns(namespaces, select)
+        return self.api.iselect(select, self.tag, namespaces, limit, flags, **kwargs)
 
     def closest(self, select, namespaces=None, flags=0, **kwargs):
         """Find the Tag closest to this one that matches the given selector.
@@ -232,13 +485,11 @@ class CSS:
         :rtype: bisque.Tag
 
         """
-        return self.api.closest(
-            select,
-            self.tag,
-            self._ns(namespaces, select),
-            flags,
-            **kwargs,
-        )
+        compiled = self._compiled(select, namespaces, flags, kwargs)
+        if compiled is not None:
+            return compiled.closest(self.tag)
+        namespaces = self._ns(namespaces, select)
+        return self.api.closest(select, self.tag, namespaces, flags, **kwargs)
 
     def match(self, select, namespaces=None, flags=0, **kwargs):
         """Check whether this Tag matches the given CSS selector.
@@ -263,13 +514,11 @@ class CSS:
         :return: True if this Tag matches the selector; False otherwise.
         :rtype: bool
         """
-        return self.api.match(
-            select,
-            self.tag,
-            self._ns(namespaces, select),
-            flags,
-            **kwargs,
-        )
+        compiled = self._compiled(select, namespaces, flags, kwargs)
+        if compiled is not None:
+            return compiled.match(self.tag)
+        namespaces = self._ns(namespaces, select)
+        return self.api.match(select, self.tag, namespaces, flags, **kwargs)
 
     def filter(self, select, namespaces=None, flags=0, **kwargs):
         """Filter this Tag's direct children based on the given CSS selector.
@@ -294,12 +543,62 @@ class CSS:
         :rtype: bisque.element.ResultSet
 
         """
+        compiled = self._compiled(select, namespaces, flags, kwargs)
+        if compiled is not None:
+            return self._rs(compiled.filter(self.tag))
+        namespaces = self._ns(namespaces, select)
         return self._rs(
-            self.api.filter(
-                select,
-                self.tag,
-                self._ns(namespaces, select),
-                flags,
-                **kwargs,
-            ),
+            self.api.filter(select, self.tag, namespaces, flags, **kwargs),
         )
+
+    def filter_many(self, selects, namespaces=None, flags=0, **kwargs):
+        """Filter this Tag's direct children against several CSS
+        selectors, in a single pass over the children.
+
+        Each result is the same as calling filter() with that
+        selector, but the children are only iterated over once, which
+        matters for a Tag with a very large number of children.
+
+        :param selects: A list of strings containing CSS selectors.
+
+        :param namespaces: A dictionary mapping namespace prefixes
+            used in the CSS selectors to namespace URIs. By default,
+            Bisque will pass in the prefixes it encountered while
+            parsing the document.
+
+        :param flags: Flags to be passed into Chinois's
+            chinois.filter() method.
+
+        :param kwargs: Keyword arguments to be passed into SoupSieve's
+            chinois.filter() method.
+
+        :return: A list of ResultSets of Tag objects, one for each
+            selector, in the same order as the selectors.
+        :rtype: list
+        """
+        if self.api is not chinois:
+            return [
+                self.filter(select, namespaces, flags, **kwargs) for select in selects
+            ]
+        # filter() matches each child with this Tag as the :scope, so
+        # build the same kind of matcher here, once per selector.
+        matchers = []
+        for select in selects:
+            compiled = self.compile(select, namespaces, flags, **kwargs)
+            matchers.append(
+                CSSMatch(
+                    compiled.selectors,
+                    self.tag,
+                    compiled.namespaces,
+                    compiled.flags,
+                ).match,
+            )
+        tag_class = self.tag.TYPE_TABLE.Tag
+        results = [[] for _ in matchers]
+        for child in self.tag.children:
+            if not isinstance(child, tag_class):
+                continue
+            for matched, match in zip(results, matchers):
+                if match(child):
+                    matched.append(child)
+        return [self._rs(matched) for matched in results]
@@ -2,25 +2,40 @@
 Import a library to autodetect character encodings. We'll support
 any of a number of libraries that all support the same API:
 
-* cchardet
+* cchardet (or its maintained fork, faust-cchardet)
 * chardet
 * charset-normalizer
+
+They're tried in that order, so the C-backed cchardet is used
+whenever it's installed.
 """
 
-from contextlib import suppress
+from importlib import import_module
+from importlib.util import find_spec
+
+__all__ = ["chardet_module", "BACKEND_NAME", "detect"]
 
-__all__ = ["chardet_module"]
+# In order of preference. Checking for each module's spec first means
+# a missing library costs a lookup rather than a raised ImportError.
+_CANDIDATES = (
+    "cchardet",  # PyPI package: cchardet or faust-cchardet
+    "chardet",  # Debian package: python-chardet; PyPI package: chardet
+    "charset_normalizer",  # PyPI package: charset-normalizer
+)
 
 chardet_module = None
-try:
-    #  PyPI package: cchardet
-    import cchardet as chardet_module
-except ImportError:
+for _name in _CANDIDATES:
+    if find_spec(_name) is None:
+        continue
     try:
-        #  Debian package: python-chardet
-        #  PyPI package: chardet
-        import chardet as chardet_module
+        chardet_module = import_module(_name)
     except ImportError:
-        with suppress(ImportError):
-            # PyPI package: charset-normalizer
-            import charset_normalizer as chardet_module
+        # Installed, but broken (e.g. a failed C extension build).
+        continue
+    break
+del _name
+
+# The name of the library that was found, and its detect() function bound
+# once here rather than looked up on the module for each document.
+BACKEND_NAME = chardet_module.__name__ if chardet_module is not None else None
+detect = chardet_module.detect if chardet_module is not None else None
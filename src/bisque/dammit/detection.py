@@ -1,18 +1,120 @@
 import codecs
 import logging
 import re
+from functools import lru_cache
 
-from .dependency_resolution import chardet_module
+from .dependency_resolution import detect as chardet_detect
 from .encodings import encoding_res
 
 __all__ = ["chardet_dammit", "UnicodeDammit", "EncodingDetector", "UnicodeDammit"]
 
 
 def chardet_dammit(s):
-    if chardet_module is None or isinstance(s, str):
+    if chardet_detect is None or isinstance(s, str):
         return None
-    else:
-        return chardet_module.detect(s)["encoding"]
+    if s and s.isascii() and b"\x1b" not in s and b"~{" not in s:
+        # Plain ASCII needs no statistical model. But 7-bit encodings
+        # like ISO-2022-JP and HZ-GB-2312 pass isascii() too, so
+        # anything with an escape sequence (ESC, or HZ's "~{") still
+        # goes to the detector.
+        return "ascii"
+    return chardet_detect(s)["encoding"]
+
+
+@lru_cache(maxsize=256)
+def _lookup_codec(charset):
+    """Check whether Python has a codec for a character set.
+
+    Only a handful of names are ever looked up, and an unknown one costs
+    a search of every codec search function, so the answers are cached.
+
+    :param charset: The name of a character set.
+    :return: `charset` if there's a codec for it, otherwise None.
+    """
+    try:
+        codecs.lookup(charset)
+    except (LookupError, ValueError):
+        return None
+    return charset
+
+
+@lru_cache(maxsize=256)
+def _find_codec(charset, aliased):
+    """The work behind UnicodeDammit.find_codec(), cached as a whole so
+    that a repeat call is a single lookup.
+
+    :param charset: The name of a character set.
+    :param aliased: `charset` after applying UnicodeDammit.CHARSET_ALIASES.
+    :return: The name of a codec.
+    """
+    value = (
+        (aliased and _lookup_codec(aliased))
+        or (charset and _lookup_codec(charset.replace("-", "")))
+        or (charset and _lookup_codec(charset.replace("-", "_")))
+        or (charset and charset.lower())
+        or charset
+    )
+    return value.lower() if value else None
+
+
+def _ms_char_substitutions(ms_chars, ms_chars_to_ascii):
+    """Work out the replacement for each MS smart quote ahead of time.
+
+    :param ms_chars: A dict mapping MS characters to a string, or to a
+        tuple of an HTML entity name and a hexadecimal code point.
+    :param ms_chars_to_ascii: A dict mapping MS characters to ASCII strings.
+    :return: A dict mapping each value of smart_quotes_to ("ascii",
+        "xml" or "html") to a dict of replacement bytestrings.
+    """
+    xml = {}
+    html = {}
+    for char, sub in ms_chars.items():
+        if isinstance(sub, tuple):
+            xml[char] = b"&#x" + sub[1].encode() + b";"
+            html[char] = b"&" + sub[0].encode() + b";"
+        else:
+            xml[char] = html[char] = sub.encode()
+    to_ascii = {
+        char: sub.encode()
+        for char, sub in ms_chars_to_ascii.items()
+        if isinstance(sub, str)
+    }
+    return {"ascii": to_ascii, "xml": xml, "html": html}
+
+
+def _byte_class(byte_values):
+    """Make a regular expression character class matching the given bytes."""
+    return b"[" + b"".join(b"\\x%02x" % value for value in byte_values) + b"]"
+
+
+def _detwingle_re(translations, markers_and_sizes):
+    """Compile the regular expression UnicodeDammit.detwingle() scans with.
+
+    It splits a bytestring into two kinds of match: runs of bytes that
+    stay as they are, and (in group 1) single bytes to be translated.
+    UTF-8 multibyte characters are matched whole, up to their full size
+    or the end of the string, so the bytes inside them are never taken
+    for bytes to translate.
+
+    :param translations: A dict mapping byte values to their replacements.
+    :param markers_and_sizes: A list of (first, last, size) tuples giving
+        the range of lead bytes for each size of UTF-8 multibyte character.
+    """
+    lead_bytes = set()
+    multibyte = []
+    for start, end, size in markers_and_sizes:
+        lead_bytes.update(range(start, end + 1))
+        multibyte.append(
+            _byte_class(range(start, end + 1)) + b"[\\x00-\\xff]{0,%d}" % (size - 1),
+        )
+    translate = sorted(
+        value for value in translations if value >= 0x80 and value not in lead_bytes
+    )
+    keep = sorted(set(range(0x100)) - lead_bytes - set(translate))
+    return re.compile(
+        b"(?:%s)+|(%s)"
+        % (b"|".join([_byte_class(keep) + b"+"] + multibyte), _byte_class(translate)),
+    )
 
 
 class EncodingDetector:
@@ -92,6 +194,10 @@ class EncodingDetector:
         self.chardet_encoding = None
         self.is_html = is_html
         self.declared_encoding = None
+        # The encodings generated so far, and the generator producing
+        # the rest, shared by every pass over self.encodings.
+        self._proposed_encodings = []
+        self._encoding_generator = None
 
         # First order of business: strip a byte-order mark.
         self.markup, self.sniffed_encoding = self.strip_byte_order_mark(markup)
@@ -116,6 +222,28 @@ class EncodingDetector:
     def encodings(self):
         """Yield a number of encodings that might work for this markup.
 
+        The encodings are worked out lazily, the first time they're
+        needed, and remembered, so a second pass over this property
+        replays them rather than working them out again.
+
+        :yield: A sequence of strings.
+        """
+        proposed = self._proposed_encodings
+        i = 0
+        while True:
+            if i == len(proposed):
+                if self._encoding_generator is None:
+                    self._encoding_generator = self._generate_encodings()
+                encoding = next(self._encoding_generator, None)
+                if encoding is None:
+                    return
+                proposed.append(encoding)
+            yield proposed[i]
+            i += 1
+
+    def _generate_encodings(self):
+        """Work out the encodings that might work for this markup.
+
         :yield: A sequence of strings.
         """
         tried = set()
@@ -152,6 +280,17 @@ class EncodingDetector:
             if self._usable(e, tried):
                 yield e
 
+    # Byte-order marks, the shortest data they're recognized in, and
+    # the encodings they imply. The UTF-32 marks come first, because
+    # the UTF-32LE mark starts with the UTF-16LE one.
+    _BYTE_ORDER_MARKS = (
+        (b"\x00\x00\xfe\xff", 4, "utf-32be"),
+        (b"\xff\xfe\x00\x00", 4, "utf-32le"),
+        (b"\xef\xbb\xbf", 3, "utf-8"),
+        (b"\xfe\xff", 4, "utf-16be"),
+        (b"\xff\xfe", 4, "utf-16le"),
+    )
+
     @classmethod
     def strip_byte_order_mark(cls, data):
         """If a byte-order mark is present, strip it and return the encoding it implies.
@@ -159,28 +298,13 @@ class EncodingDetector:
         :param data: Some markup.
         :return: A 2-tuple (modified data, implied encoding)
         """
-        encoding = None
         if isinstance(data, str):
             # Unicode data cannot have a byte-order mark.
-            return data, encoding
-        if (len(data) >= 4) and (data[:2] == b"\xfe\xff") and (data[2:4] != "\x00\x00"):
-            encoding = "utf-16be"
-            data = data[2:]
-        elif (
-            (len(data) >= 4) and (data[:2] == b"\xff\xfe") and (data[2:4] != "\x00\x00")
-        ):
-            encoding = "utf-16le"
-            data = data[2:]
-        elif data[:3] == b"\xef\xbb\xbf":
-            encoding = "utf-8"
-            data = data[3:]
-        elif data[:4] == b"\x00\x00\xfe\xff":
-            encoding = "utf-32be"
-            data = data[4:]
-        elif data[:4] == b"\xff\xfe\x00\x00":
-            encoding = "utf-32le"
-            data = data[4:]
-        return data, encoding
+            return data, None
+        for bom, min_length, encoding in cls._BYTE_ORDER_MARKS:
+            if data.startswith(bom) and len(data) >= min_length:
+                return data[len(bom) :], encoding
+        return data, None
 
     @classmethod
     def find_declared_encoding(
@@ -210,16 +334,26 @@ class EncodingDetector:
             html_endpos = max(2048, int(len(markup) * 0.05))
         if isinstance(markup, bytes):
             res = encoding_res[bytes]
+            meta = b"meta"
         else:
             res = encoding_res[str]
+            meta = "meta"
         xml_re = res["xml"]
         html_re = res["html"]
         declared_encoding = None
+        # xml_re is anchored to the start of the document, so it fails fast.
         declared_encoding_match = xml_re.search(markup, endpos=xml_endpos)
-        if not declared_encoding_match and is_html:
+        # html_re can only match where "meta" appears (in any case), and
+        # finding that in a lowercased copy is much cheaper than a
+        # case-insensitive regex search that won't match.
+        if (
+            not declared_encoding_match
+            and is_html
+            and meta in markup[:html_endpos].lower()
+        ):
             declared_encoding_match = html_re.search(markup, endpos=html_endpos)
         if declared_encoding_match is not None:
-            declared_encoding = declared_encoding_match.groups()[0]
+            declared_encoding = declared_encoding_match.group(1)
         if declared_encoding:
             if isinstance(declared_encoding, bytes):
                 declared_encoding = declared_encoding.decode("ascii", "replace")
@@ -240,6 +374,9 @@ class UnicodeDammit:
     CHARSET_ALIASES = {"macintosh": "mac-roman", "x-sjis": "shift-jis"}
     ENCODINGS_WITH_SMART_QUOTES = ["windows-1252", "iso-8859-1", "iso-8859-2"]
 
+    # Matches the bytes that are MS smart quotes in those encodings.
+    _SMART_QUOTES_RE = re.compile(b"([\x80-\x9f])")
+
     def __init__(
         self,
         markup,
@@ -308,7 +445,6 @@ class UnicodeDammit:
         self.markup = self.detector.markup
         u = None
         for encoding in self.detector.encodings:
-            markup = self.detector.markup
             u = self._convert_from(encoding)
             if u is not None:
                 break
@@ -335,19 +471,10 @@ class UnicodeDammit:
     def _sub_ms_char(self, match):
         """Changes a MS smart quote character to an XML or HTML
         entity, or an ASCII character."""
-        orig = match.group(1)
-        if self.smart_quotes_to == "ascii":
-            sub = self.MS_CHARS_TO_ASCII.get(orig).encode()
-        else:
-            sub = self.MS_CHARS.get(orig)
-            if isinstance(sub, tuple):
-                if self.smart_quotes_to == "xml":
-                    sub = b"&#x" + sub[1].encode() + b";"
-                else:
-                    sub = b"&" + sub[0].encode() + b";"
-            else:
-                sub = sub.encode()
-        return sub
+        substitutions = self._MS_CHAR_SUBSTITUTIONS
+        # Anything other than "ascii" or "xml" means HTML entities.
+        table = substitutions.get(self.smart_quotes_to) or substitutions["html"]
+        return table[match.group(1)]
 
     def _convert_from(self, proposed, errors="strict"):
         """Attempt to convert the markup to the proposed encoding.
@@ -365,9 +492,7 @@ class UnicodeDammit:
             self.smart_quotes_to is not None
             and proposed in self.ENCODINGS_WITH_SMART_QUOTES
         ):
-            smart_quotes_re = b"([\x80-\x9f])"
-            smart_quotes_compiled = re.compile(smart_quotes_re)
-            markup = smart_quotes_compiled.sub(self._sub_ms_char, markup)
+            markup = self._SMART_QUOTES_RE.sub(self._sub_ms_char, markup)
         try:
             # print(f"Trying to convert document to {proposed} ({errors=})")
             self.markup = self._to_unicode(markup, proposed, errors)
@@ -397,25 +522,12 @@ class UnicodeDammit:
         :param charset: The name of a character set.
         :return: The name of a codec.
         """
-        value = (
-            self._codec(self.CHARSET_ALIASES.get(charset, charset))
-            or (charset and self._codec(charset.replace("-", "")))
-            or (charset and self._codec(charset.replace("-", "_")))
-            or (charset and charset.lower())
-            or charset
-        )
-        return value.lower() if value else None
+        return _find_codec(charset, self.CHARSET_ALIASES.get(charset, charset))
 
     def _codec(self, charset):
         if not charset:
             return charset
-        codec = None
-        try:
-            codecs.lookup(charset)
-            codec = charset
-        except (LookupError, ValueError):
-            pass
-        return codec
+        return _lookup_codec(charset)
 
     # A partial mapping of ISO-Latin-1 to HTML entities/XML numeric entities.
     MS_CHARS = {
@@ -588,6 +700,8 @@ class UnicodeDammit:
         b"\xff": "y",
     }
 
+    _MS_CHAR_SUBSTITUTIONS = _ms_char_substitutions(MS_CHARS, MS_CHARS_TO_ASCII)
+
     # A map used when removing rogue Windows-1252/ISO-8859-1 characters in otherwise
     # UTF-8 documents.
     #
@@ -726,6 +840,10 @@ class UnicodeDammit:
     FIRST_MULTIBYTE_MARKER = MULTIBYTE_MARKERS_AND_SIZES[0][0]
     LAST_MULTIBYTE_MARKER = MULTIBYTE_MARKERS_AND_SIZES[-1][1]
 
+    _DETWINGLE_RE = _detwingle_re(WINDOWS_1252_TO_UTF8, MULTIBYTE_MARKERS_AND_SIZES)
+    # WINDOWS_1252_TO_UTF8 as a 256-entry tuple indexed by byte value.
+    _WINDOWS_1252_TO_UTF8_TABLE = tuple(map(WINDOWS_1252_TO_UTF8.get, range(256)))
+
     @classmethod
     def detwingle(
         cls,
@@ -761,34 +879,36 @@ class UnicodeDammit:
             raise NotImplementedError(
                 "UTF-8 is the only currently supported main encoding.",
             )
-        byte_chunks = []
+        try:
+            in_bytes.decode("utf8")
+        except UnicodeDecodeError:
+            pass
+        else:
+            # In valid UTF-8 every byte over 0x7F is part of a multibyte
+            # character, so there's nothing to translate, and the
+            # decoder can tell us that far faster than a scan can.
+            return in_bytes
+        translations = cls._WINDOWS_1252_TO_UTF8_TABLE
+        # Copy straight out of the input into one growing buffer,
+        # rather than making a bytes object for every chunk.
+        in_view = memoryview(in_bytes)
+        out = bytearray()
         chunk_start = 0
-        pos = 0
-        while pos < len(in_bytes):
-            byte = in_bytes[pos]
-            if byte >= cls.FIRST_MULTIBYTE_MARKER and byte <= cls.LAST_MULTIBYTE_MARKER:
-                # This is the start of a UTF-8 multibyte character. Skip
-                # to the end.
-                for start, end, size in cls.MULTIBYTE_MARKERS_AND_SIZES:
-                    if byte >= start and byte <= end:
-                        pos += size
-                        break
-            elif byte >= 0x80 and byte in cls.WINDOWS_1252_TO_UTF8:
-                # We found a Windows-1252 character!
-                # Save the string up to this point as a chunk.
-                byte_chunks.append(in_bytes[chunk_start:pos])
-                # Now translate the Windows-1252 character into UTF-8
-                # and add it as another, one-byte chunk.
-                byte_chunks.append(cls.WINDOWS_1252_TO_UTF8[byte])
-                pos += 1
-                chunk_start = pos
-            else:
-                # Go on to the next character.
-                pos += 1
+        # The scan runs in the regular expression engine; only the
+        # (usually few) Windows-1252 characters are handled here.
+        for match in cls._DETWINGLE_RE.finditer(in_bytes):
+            if match.lastindex is None:
+                # A run of bytes that stay as they are.
+                continue
+            pos = match.start()
+            # We found a Windows-1252 character! Copy over the string up
+            # to this point, then the UTF-8 translation of the character.
+            out += in_view[chunk_start:pos]
+            out += translations[in_bytes[pos]]
+            chunk_start = pos + 1
         if chunk_start == 0:
             # The string is unchanged.
             return in_bytes
-        else:
-            # Store the final chunk.
-            byte_chunks.append(in_bytes[chunk_start:])
-        return b"".join(byte_chunks)
+        # Copy over the final chunk.
+        out += in_view[chunk_start:]
+        return bytes(out)
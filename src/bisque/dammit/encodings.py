@@ -4,18 +4,66 @@ a declared encoding inside an XML or HTML document.
 """
 
 import re
+import sys
 
 __all__ = ["encoding_res"]
 
 xml_encoding = "^\\s*<\\?.*encoding=['\"](.*?)['\"].*\\?>"
-html_meta = "<\\s*meta[^>]+charset\\s*=\\s*[\"']?([^>]*?)[ /;'\">]"
+html_meta_start = "<\\s*meta"
+html_meta = html_meta_start + "[^>]+charset\\s*=\\s*[\"']?([^>]*?)[ /;'\">]"
+
+
+class _MetaCharsetPattern:
+    """A compiled html_meta pattern whose search() takes linear time.
+
+    A plain html_meta search retries from every "<meta" in the document,
+    and each retry scans ahead to the next ">", so a run of "<meta"s
+    with no ">" takes quadratic time. But a retry can only see a suffix
+    of what the failed attempt before it saw, so once an attempt fails,
+    every "<meta" before the next ">" will fail too, and this skips
+    straight past them.
+    """
+
+    def __init__(self, pattern, start, close):
+        """Constructor.
+
+        :param pattern: html_meta, as a str or bytes.
+        :param start: html_meta_start, of the same type.
+        :param close: ">", of the same type.
+        """
+        self.regex = re.compile(pattern, re.I)
+        self._start_re = re.compile(start, re.I)
+        self._close = close
+
+    def search(self, string, pos=0, endpos=sys.maxsize):
+        """Find the first match of html_meta in `string`.
+
+        :return: The same match object as self.regex.search() would return.
+        """
+        endpos = min(endpos, len(string))
+        while True:
+            start = self._start_re.search(string, pos, endpos)
+            if start is None:
+                return None
+            match = self.regex.match(string, start.start(), endpos)
+            if match is not None:
+                return match
+            pos = string.find(self._close, start.end(), endpos) + 1
+            if not pos:
+                return None
+
+
 encoding_res = {
     bytes: {
-        "html": re.compile(html_meta.encode("ascii"), re.I),
+        "html": _MetaCharsetPattern(
+            html_meta.encode("ascii"),
+            html_meta_start.encode("ascii"),
+            b">",
+        ),
         "xml": re.compile(xml_encoding.encode("ascii"), re.I),
     },
     str: {
-        "html": re.compile(html_meta, re.I),
+        "html": _MetaCharsetPattern(html_meta, html_meta_start, ">"),
         "xml": re.compile(xml_encoding, re.I),
     },
 }
@@ -1,19 +1,59 @@
 import re
-from collections import defaultdict
+from functools import lru_cache
 from html.entities import codepoint2name, html5
 
 __all__ = ["EntitySubstitution"]
 
 
+@lru_cache(maxsize=8192)
+def _substitute_short_html(cls, s):
+    """Run cls.substitute_html()'s regular expression over a short string.
+
+    Short strings like names and single words repeat a lot within a
+    document, so this is cached. Long strings rarely repeat, and would
+    only push the short ones out of the cache.
+    """
+    return cls.CHARACTER_TO_HTML_ENTITY_RE.sub(cls._substitute_html_entity, s)
+
+
+class _EntityTable:
+    """A class attribute holding one of the values that
+    EntitySubstitution._populate_class_variables() returns.
+
+    Working them out takes a few milliseconds, which a program that
+    never touches HTML entities shouldn't spend at import time. So the
+    first lookup of any of them works them all out, and they replace
+    their descriptors as plain class attributes.
+    """
+
+    NAMES = (
+        "CHARACTER_TO_HTML_ENTITY",
+        "HTML_ENTITY_TO_CHARACTER",
+        "CHARACTER_TO_HTML_ENTITY_RE",
+        "_CHARACTER_TO_HTML_REPLACEMENT",
+    )
+
+    def __set_name__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        values = self.owner._populate_class_variables()
+        for name, value in zip(self.NAMES, values):
+            setattr(self.owner, name, value)
+        return getattr(self.owner, self.name)
+
+
 class EntitySubstitution:
     """The ability to substitute XML or HTML entities for certain characters."""
 
+    @staticmethod
     def _populate_class_variables():
         """Initialize variables used by this class to manage the plethora of
         HTML5 named entities.
 
-        This function returns a 3-tuple containing two dictionaries
-        and a regular expression:
+        This function returns a 4-tuple containing two dictionaries,
+        a regular expression and a third dictionary:
 
         unicode_to_name - A mapping of Unicode strings like "⦨" to
         entity names like "angmsdaa". When a single Unicode string has
@@ -25,12 +65,18 @@ class EntitySubstitution:
 
         named_entity_re: A regular expression matching (almost) any
         Unicode string that corresponds to an HTML5 named entity.
+
+        substitutable_to_replacement: A mapping of every string that
+        named_entity_re is meant to find to its replacement, like
+        "&angmsdaa;".
         """
         unicode_to_name = {}
         name_to_unicode = {}
 
-        short_entities = set()
-        long_entities_by_first_character = defaultdict(set)
+        substitutable = []
+        firsts = set()
+        seconds = set()
+        long_firsts = set()
 
         for name_with_semicolon, character in sorted(html5.items()):
             # "It is intentional, for legacy compatibility, that many
@@ -64,14 +110,14 @@ class EntitySubstitution:
             #
             # This is tricky, for two reasons.
 
-            if len(character) == 1 and ord(character) < 128 and character not in "<>&":
+            if len(character) == 1 and character.isascii() and character not in "<>&":
                 # First, it would be annoying to turn single ASCII
                 # characters like | into named entities like
                 # &verbar;. The exceptions are <>&, which we _must_
                 # turn into named entities to produce valid HTML.
                 continue
 
-            if len(character) > 1 and all(ord(x) < 128 for x in character):
+            if len(character) > 1 and character.isascii():
                 # We also do not want to turn _combinations_ of ASCII
                 # characters like 'fj' into named entities like '&fjlig;',
                 # though that's more debateable.
@@ -85,34 +131,17 @@ class EntitySubstitution:
             # "\u2267\u0338foo", but only the first character of
             # "\u2267foo".
             #
-            # In this step, we build two sets of characters that
+            # In this step, we collect the characters that
             # _eventually_ need to go into the regular expression. But
             # we won't know exactly what the regular expression needs
             # to look like until we've gone through the entire list of
             # named entities.
-            if len(character) == 1:
-                short_entities.add(character)
-            else:
-                long_entities_by_first_character[character[0]].add(character)
-
-        # Now that we've been through the entire list of entities, we
-        # can create a regular expression that matches any of them.
-        particles = set()
-        for short in short_entities:
-            long_versions = long_entities_by_first_character[short]
-            if not long_versions:
-                particles.add(short)
-            else:
-                ignore = "".join([x[1] for x in long_versions])
-                # This finds, e.g. \u2267 but only if it is _not_
-                # followed by \u0338.
-                particles.add(f"{short}(?![{ignore}])")
-
-        for long_entities in list(long_entities_by_first_character.values()):
-            for long_entity in long_entities:
-                particles.add(long_entity)
-
-        re_definition = "(%s)" % "|".join(particles)
+            substitutable.append(character)
+            firsts.add(character[0])
+            if len(character) > 1:
+                assert len(character) == 2
+                long_firsts.add(character[0])
+                seconds.add(character[1])
 
         # If an entity shows up in both html5 and codepoint2name, it's
         # likely that HTML5 gives it several different names, such as
@@ -124,13 +153,46 @@ class EntitySubstitution:
             character = chr(codepoint)
             unicode_to_name[character] = name
 
-        return unicode_to_name, name_to_unicode, re.compile(re_definition)
-
-    (
-        CHARACTER_TO_HTML_ENTITY,
-        HTML_ENTITY_TO_CHARACTER,
-        CHARACTER_TO_HTML_ENTITY_RE,
-    ) = _populate_class_variables()
+        # Now that we've been through the entire list of entities, we
+        # can create a regular expression that finds any of them.
+        # Every long entity is two characters long, and its second
+        # character never starts another long entity, so rather than one
+        # alternative per entity (which the regex engine would have
+        # to try one by one at every position), the regular
+        # expression is a single character class, optionally followed
+        # by a second character. substitute_html() then looks the
+        # match up in substitutable_to_replacement, splitting up any
+        # pair that is not an entity after all.
+        assert long_firsts.isdisjoint(seconds)
+        substitutable_to_replacement = {
+            character: "&%s;" % unicode_to_name[character]
+            for character in substitutable
+        }
+
+        # Characters outside the Basic Multilingual Plane are checked
+        # one at a time against every character in the class, which
+        # makes the whole scan several times slower. They're all
+        # mathematical letters, close together, so a single range
+        # covers them, and any non-entity it matches is left alone.
+        astral = sorted(x for x in firsts if ord(x) > 0xFFFF)
+        firsts.difference_update(astral)
+        re_definition = "([%s%s][%s]?)" % (
+            "".join(map(re.escape, sorted(firsts))),
+            "%s-%s" % (astral[0], astral[-1]) if astral else "",
+            "".join(map(re.escape, sorted(seconds))),
+        )
+
+        return (
+            unicode_to_name,
+            name_to_unicode,
+            re.compile(re_definition),
+            substitutable_to_replacement,
+        )
+
+    CHARACTER_TO_HTML_ENTITY = _EntityTable()
+    HTML_ENTITY_TO_CHARACTER = _EntityTable()
+    CHARACTER_TO_HTML_ENTITY_RE = _EntityTable()
+    _CHARACTER_TO_HTML_REPLACEMENT = _EntityTable()
 
     CHARACTER_TO_XML_ENTITY = {
         "'": "apos",
@@ -146,19 +208,20 @@ class EntitySubstitution:
 
     AMPERSAND_OR_BRACKET = re.compile("([<>&])")
 
+    BARE_AMPERSAND = re.compile("&(?!#\\d+;|#x[0-9a-fA-F]+;|\\w+;)")
+
     @classmethod
     def _substitute_html_entity(cls, matchobj):
         """Used with a regular expression to substitute the
         appropriate HTML entity for a special character string."""
-        entity = cls.CHARACTER_TO_HTML_ENTITY.get(matchobj.group(0))
-        return "&%s;" % entity
-
-    @classmethod
-    def _substitute_xml_entity(cls, matchobj):
-        """Used with a regular expression to substitute the
-        appropriate XML entity for a special character string."""
-        entity = cls.CHARACTER_TO_XML_ENTITY[matchobj.group(0)]
-        return "&%s;" % entity
+        character = matchobj.group(0)
+        replacement = cls._CHARACTER_TO_HTML_REPLACEMENT.get(character)
+        if replacement is not None:
+            return replacement
+        if len(character) == 1:
+            return character
+        # Two characters that aren't an entity together.
+        return "".join(cls._CHARACTER_TO_HTML_REPLACEMENT.get(x, x) for x in character)
 
     @classmethod
     def quoted_attribute_value(self, value):
@@ -179,23 +242,22 @@ class EntitySubstitution:
 
          Welcome to "Bob's Bar" -> "Welcome to &quot;Bob's bar&quot;
         """
-        quote_with = '"'
-        if '"' in value:
-            if "'" in value:
-                # The string contains both single and double
-                # quotes.  Turn the double quotes into
-                # entities. We quote the double quotes rather than
-                # the single quotes because the entity name is
-                # "&quot;" whether this is HTML or XML.  If we
-                # quoted the single quotes, we'd have to decide
-                # between &apos; and &squot;.
-                replace_with = "&quot;"
-                value = value.replace('"', replace_with)
-            else:
-                # There are double quotes but no single quotes.
-                # We can use single quotes to quote the attribute.
-                quote_with = "'"
-        return quote_with + value + quote_with
+        if '"' not in value:
+            # The usual case, settled by a single scan of the string.
+            return f'"{value}"'
+        if "'" not in value:
+            # There are double quotes but no single quotes.
+            # We can use single quotes to quote the attribute.
+            return f"'{value}'"
+        # The string contains both single and double
+        # quotes.  Turn the double quotes into
+        # entities. We quote the double quotes rather than
+        # the single quotes because the entity name is
+        # "&quot;" whether this is HTML or XML.  If we
+        # quoted the single quotes, we'd have to decide
+        # between &apos; and &squot;.
+        replace_with = "&quot;"
+        return '"%s"' % value.replace('"', replace_with)
 
     @classmethod
     def substitute_xml(cls, value, make_quoted_attribute=False):
@@ -210,8 +272,13 @@ class EntitySubstitution:
         :param make_quoted_attribute: If True, then the string will be
          quoted, as befits an attribute value.
         """
-        # Escape angle brackets and ampersands.
-        value = cls.AMPERSAND_OR_BRACKET.sub(cls._substitute_xml_entity, value)
+        # Escape angle brackets and ampersands. This does the same as
+        # AMPERSAND_OR_BRACKET.sub(), without a function call per
+        # match. Most strings have none of them, and looking is
+        # cheaper than replacing.
+        if "&" in value or "<" in value or ">" in value:
+            value = value.replace("&", "&amp;").replace("<", "&lt;")
+            value = value.replace(">", "&gt;")
 
         if make_quoted_attribute:
             value = cls.quoted_attribute_value(value)
@@ -230,8 +297,13 @@ class EntitySubstitution:
          quoted, as befits an attribute value.
         """
         # Escape angle brackets, and ampersands that aren't part of
-        # entities.
-        value = cls.BARE_AMPERSAND_OR_BRACKET.sub(cls._substitute_xml_entity, value)
+        # entities. This does the same as BARE_AMPERSAND_OR_BRACKET.sub(),
+        # without a function call per match. The ampersands go first,
+        # so the ones in &lt; and &gt; are left alone.
+        if "&" in value:
+            value = cls.BARE_AMPERSAND.sub("&amp;", value)
+        if "<" in value or ">" in value:
+            value = value.replace("<", "&lt;").replace(">", "&gt;")
 
         if make_quoted_attribute:
             value = cls.quoted_attribute_value(value)
@@ -251,4 +323,12 @@ class EntitySubstitution:
 
         :param s: A Unicode string.
         """
+        if s.isascii():
+            # The only ASCII characters that get substituted are
+            # these three, and most strings have none of them.
+            if "&" in s or "<" in s or ">" in s:
+                s = s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            return s
+        if len(s) <= 64:
+            return _substitute_short_html(cls, s)
         return cls.CHARACTER_TO_HTML_ENTITY_RE.sub(cls._substitute_html_entity, s)
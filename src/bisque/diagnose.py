@@ -96,8 +96,13 @@ class AnnouncingParser(HTMLParser):
     document. The easiest way to do this is to call `htmlparser_trace`.
     """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Looked up once here rather than by print() for every event.
+        self._write = sys.stdout.write
+
     def _p(self, s):
-        print(s)
+        self._write(s + "\n")
 
     def handle_starttag(self, name, attrs):
         self._p(f"{name} START")
@@ -141,14 +146,11 @@ def htmlparser_trace(data):
 
 def rword(length=5):
     "Generate a random word-like string."
-    s = ""
-    for i in range(length):
-        if i % 2 == 0:
-            t = _consonants
-        else:
-            t = _vowels
-        s += random.choice(t)
-    return s
+    # Consonants go in the even positions and vowels in the odd ones.
+    letters = [""] * length
+    letters[::2] = random.choices(_consonants, k=(length + 1) // 2)
+    letters[1::2] = random.choices(_vowels, k=length // 2)
+    return "".join(letters)
 
 
 def rsentence(length=4):
@@ -159,19 +161,25 @@ def rsentence(length=4):
 def rdoc(num_elements=1000):
     """Randomly generate an invalid HTML document."""
     tag_names = ["p", "div", "span", "i", "b", "script", "table"]
+    # Generating a fresh word for every sentence takes most of the time
+    # for a big document, so the sentences draw from a bank of words
+    # (no bigger than the document needs), and every other random choice
+    # is made up front in one batch.
+    bank_size = max(1, min(4096, num_elements))
+    words = [rword(length) for length in random.choices(range(4, 10), k=bank_size)]
+    choices = random.choices(range(4), k=num_elements)
+    tags = iter(random.choices(tag_names, k=num_elements))
+    lengths = iter(random.choices(range(1, 5), k=num_elements))
     elements = []
-    for i in range(num_elements):
-        choice = random.randint(0, 3)
+    for choice in choices:
         if choice == 0:
             # New tag.
-            tag_name = random.choice(tag_names)
-            elements.append("<%s>" % tag_name)
+            elements.append("<%s>" % next(tags))
         elif choice == 1:
-            elements.append(rsentence(random.randint(1, 4)))
+            elements.append(" ".join(random.choices(words, k=next(lengths))))
         elif choice == 2:
             # Close a tag.
-            tag_name = random.choice(tag_names)
-            elements.append("</%s>" % tag_name)
+            elements.append("</%s>" % next(tags))
     return "<html>" + "\n".join(elements) + "</html>"
 
 
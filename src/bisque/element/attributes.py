@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from typing import ClassVar
 
 from pydantic import Field, model_validator
@@ -30,7 +31,10 @@ class NamespacedAttribute(StrRecord):
     namespace: str | None = None
 
     def __str__(self) -> str:
-        return ":".join(filter(None, [self.prefix, self.name]))
+        prefix, name = self.prefix, self.name
+        if prefix and name:
+            return f"{prefix}:{name}"
+        return prefix or name or ""
 
 
 class AttributeValueWithCharsetSubstitution(StrRecord):
@@ -53,6 +57,17 @@ class CharsetMetaAttributeValue(AttributeValueWithCharsetSubstitution):
         return "" if encoding in PYTHON_SPECIFIC_ENCODINGS else encoding
 
 
+@lru_cache(maxsize=256)
+def _substitute_charset(charset_re, value, encoding):
+    """Put `encoding` in place of every charset that `charset_re` finds
+    in `value`.
+
+    A document's meta tags tend to share a handful of content values,
+    and it's encoded to the same encoding throughout, so this is cached.
+    """
+    return charset_re.sub(lambda match: match.group(1) + encoding, value)
+
+
 class ContentMetaAttributeValue(AttributeValueWithCharsetSubstitution):
     """A generic stand-in for the value of a meta tag's 'content' attribute.
 
@@ -66,6 +81,23 @@ class ContentMetaAttributeValue(AttributeValueWithCharsetSubstitution):
 
     CHARSET_RE: ClassVar[re.Pattern] = re.compile(r"((^|;)\s*charset=)([^;]*)", re.M)
 
+    @classmethod
+    def create(cls, original_value: str) -> StrRoot | ContentMetaAttributeValue:
+        """Stand in for `original_value` if it names a charset.
+
+        This makes the same choice as the validator below, without
+        running pydantic validation, and without the warning pydantic
+        gives when a validator returns something other than the
+        instance being validated.
+
+        :param original_value: The value of a meta tag's 'content' attribute.
+        :return: A ContentMetaAttributeValue if `original_value` contains
+            a charset, or otherwise a StrRoot holding it unchanged.
+        """
+        if cls.CHARSET_RE.search(original_value) is None:
+            return StrRoot(original_value)
+        return cls.model_construct(original_value=original_value)
+
     @model_validator(mode="after")
     def _choose_str_type(
         cls,
@@ -78,8 +110,4 @@ class ContentMetaAttributeValue(AttributeValueWithCharsetSubstitution):
     def encode(self, encoding):
         if encoding in PYTHON_SPECIFIC_ENCODINGS:
             return ""
-
-        def rewrite(matched: re.Match):
-            return matched.group(1) + encoding
-
-        return self.CHARSET_RE.sub(rewrite, self.original_value)
+        return _substitute_charset(self.CHARSET_RE, self.original_value, encoding)
@@ -287,7 +287,8 @@ class BasePageElement(Element):
             last_child = self.next_sibling.previous_element
         else:
             last_child = self
-            while isinstance(last_child, self.TYPE_TABLE.Tag) and last_child.contents:
+            tag_class = self.TYPE_TABLE.Tag
+            while isinstance(last_child, tag_class) and last_child.contents:
                 last_child = last_child.contents[-1]
         if not accept_self and last_child is self:
             last_child = None
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from re import Pattern
-from typing import Callable
+from typing import Callable, ClassVar
 
 from pydantic import BaseModel, computed_field
 
@@ -24,6 +24,10 @@ class BaseSoupStrainer(BaseModel):
     attrs: dict = {}
     string: str | list[str] | bool | Pattern | None = None
 
+    # What search() makes of each type of markup it has been passed,
+    # so it needn't work that out again for every element.
+    _SEARCH_KINDS: ClassVar[dict[type, str]] = {}
+
     def __init__(
         self,
         name: str | bool | Pattern | list[str] | list | Callable | None = None,
@@ -125,34 +129,34 @@ class BaseSoupStrainer(BaseModel):
         """
         found = None
         markup = None
+        name = self.name
         if isinstance(markup_name, self.TYPE_TABLE.Tag):
             markup = markup_name
             markup_attrs = markup
 
-        if isinstance(self.name, str):
+        if isinstance(name, str):
             # Optimization for a very common case where the user is
             # searching for a tag with one specific name, and we're
             # looking at a tag with a different name.
-            if markup and not markup.prefix and self.name != markup.name:
+            if markup and not markup.prefix and name != markup.name:
                 return False
 
-        call_function_with_tag_data = isinstance(
-            self.name,
-            Callable,
-        ) and not isinstance(markup_name, self.TYPE_TABLE.Tag)
+        call_function_with_tag_data = markup is None and callable(name)
 
         if (
-            (not self.name)
+            (not name)
             or call_function_with_tag_data
-            or (markup and self._matches(markup, self.name))
-            or (not markup and self._matches(markup_name, self.name))
+            # The same very common case, when the names are the same.
+            or (markup and markup.name == name)
+            or (markup and self._matches(markup, name))
+            or (not markup and self._matches(markup_name, name))
         ):
             if call_function_with_tag_data:
-                match = self.name(markup_name, markup_attrs)
+                match = name(markup_name, markup_attrs)
             else:
                 match = True
                 markup_attr_map = None
-                for attr, match_against in list(self.attrs.items()):
+                for attr, match_against in self.attrs.items():
                     if not markup_attr_map:
                         if hasattr(markup_attrs, "get"):
                             markup_attr_map = markup_attrs
@@ -182,13 +186,14 @@ class BaseSoupStrainer(BaseModel):
         :param markup: A PageElement or a list of them.
         """
         # print('looking for %s in %s' % (self, markup))
+        kind = self._SEARCH_KINDS.get(type(markup))
+        if kind is None:
+            kind = self._search_kind(markup)
+            self._SEARCH_KINDS[type(markup)] = kind
         found = None
         # If given a list of items, scan it for a text element that
         # matches.
-        if hasattr(markup, "__iter__") and not isinstance(
-            markup,
-            (self.TYPE_TABLE.Tag, StrTypes),
-        ):
+        if kind == "list":
             for element in markup:
                 if isinstance(element, self.TYPE_TABLE.NavigableString) and self.search(
                     element,
@@ -197,23 +202,37 @@ class BaseSoupStrainer(BaseModel):
                     break
         # If it's a Tag, make sure its name or attributes match.
         # Don't bother with Tags if we're searching for text.
-        elif isinstance(markup, self.TYPE_TABLE.Tag):
+        elif kind == "tag":
             if not self.string or self.name or self.attrs:
                 found = self.search_tag(markup)
         # If it's text, make sure the text matches.
+        elif not self.name and not self.attrs and self._matches(markup, self.string):
+            found = markup
+        return found
+
+    def _search_kind(self, markup):
+        """Work out how search() should treat markup of this type.
+
+        :param markup: Anything search() was passed.
+        :return: "list", "tag" or "text".
+        """
+        if hasattr(markup, "__iter__") and not isinstance(
+            markup,
+            (self.TYPE_TABLE.Tag, StrTypes),
+        ):
+            return "list"
+        elif isinstance(markup, self.TYPE_TABLE.Tag):
+            return "tag"
         elif isinstance(markup, self.TYPE_TABLE.NavigableString) or isinstance(
             markup,
             StrTypes,
         ):
-            if not self.name and not self.attrs and self._matches(markup, self.string):
-                found = markup
-        else:
-            raise Exception("I don't know how to match against a %s" % markup.__class__)
-        return found
+            return "text"
+        raise Exception("I don't know how to match against a %s" % markup.__class__)
 
     def _matches(self, markup, match_against, already_tried=None):
         # print(u"Matching %s against %s" % (markup, match_against))
-        if isinstance(markup, list) or isinstance(markup, tuple):
+        if isinstance(markup, (list, tuple)):
             # This should only happen when searching a multi-valued attribute
             # like 'class'.
             for item in markup:
@@ -228,7 +247,7 @@ class BaseSoupStrainer(BaseModel):
         if match_against is True:
             # True matches any non-None value.
             return markup is not None
-        if isinstance(match_against, Callable):
+        if callable(match_against):
             return match_against(markup)
         # Custom callables take the tag as an argument, but all
         # other ways of matching match the tag name as a string.
@@ -89,6 +89,11 @@ class Bisque(Tag, arbitrary_types_allowed=True):
     preserve_whitespace_tag_stack: list = []
     string_container_stack: list = []
     most_recent_element: Tag | None = None
+    # The html5lib tree builder's Element whose trailing text is still buffered
+    pending_text_element: object | None = None
+    # The last element in the tree, cached by the html5lib tree builder while
+    # it parses and cleared when it's done
+    last_descendant_cache: object | None = None
 
     # Since Bisque subclasses Tag, it's possible to treat it as
     # a Tag with a .name. This name makes it clear the Bisque
@@ -483,6 +488,8 @@ class Bisque(Tag, arbitrary_types_allowed=True):
         self.preserve_whitespace_tag_stack = []
         self.string_container_stack = []
         self.most_recent_element = None
+        self.pending_text_element = None
+        self.last_descendant_cache = None
         self.pushTag(self)
 
     def new_tag(
@@ -130,3 +130,9 @@ class TestRegistry:
         builder1 = self.builder_for_features("foo", "bar")
         builder2 = self.builder_for_features("foo", "baz")
         assert self.registry.lookup("bar", "baz") is None
+
+    def test_lookup_ignores_features_no_builder_has(self):
+        builder1 = self.builder_for_features("foo", "bar")
+        builder2 = self.builder_for_features("foo")
+        assert self.registry.lookup("foo", "bar", "baz") == builder1
+        assert self.registry.lookup("baz", "foo") == builder2
@@ -2,7 +2,12 @@ from unittest.mock import patch
 
 import pytest
 
-from bisque.builder.core import DetectsXMLParsedAsHTML
+from bisque.builder.core import (
+    DetectsXMLParsedAsHTML,
+    HTMLTreeBuilder,
+    ParserRejectedMarkup,
+    TreeBuilder,
+)
 
 
 class TestDetectsXMLParsedAsHTML:
@@ -28,3 +33,51 @@ class TestDetectsXMLParsedAsHTML:
                 else:
                     assert not mock.called
                 mock.reset_mock()
+
+
+class TestTreeBuilder:
+    def test_cdata_list_attributes_for(self):
+        builder = HTMLTreeBuilder()
+        assert {"class", "accesskey", "dropzone", "rel", "rev"} == (
+            builder.cdata_list_attributes_for("a")
+        )
+        assert {"class", "accesskey", "dropzone"} == (
+            builder.cdata_list_attributes_for("p")
+        )
+
+    @pytest.mark.parametrize("multi_valued_attributes", [None, {}, []])
+    def test_no_cdata_list_attributes(self, multi_valued_attributes):
+        builder = TreeBuilder(multi_valued_attributes=multi_valued_attributes)
+        assert frozenset() == builder.cdata_list_attributes_for("a")
+
+    def test_cdata_list_attribute_given_as_string(self):
+        builder = TreeBuilder(multi_valued_attributes={"*": "id", "a": "rel"})
+        assert {"id"} == builder.cdata_list_attributes_for("p")
+        assert {"id", "rel"} == builder.cdata_list_attributes_for("a")
+
+    def test_cdata_list_attributes_reassigned(self):
+        builder = TreeBuilder(multi_valued_attributes={"*": "id"})
+        assert {"id"} == builder.cdata_list_attributes_for("a")
+        assert {"id": ["x"]} == builder._replace_cdata_list_attribute_values(
+            "A",
+            {"id": "x"},
+        )
+        builder.cdata_list_attributes = {"a": ["rel"]}
+        assert {"a": ["rel"]} == builder.cdata_list_attributes
+        assert {"rel"} == builder.cdata_list_attributes_for("a")
+        assert frozenset() == builder.cdata_list_attributes_for("p")
+        # The per-name cache from the earlier lookup is discarded too.
+        assert {"id": "x"} == builder._replace_cdata_list_attribute_values(
+            "A",
+            {"id": "x"},
+        )
+
+
+class TestParserRejectedMarkup:
+    def test_message(self):
+        assert str(ParserRejectedMarkup("Nope.")) == "Nope."
+
+    def test_wrapped_exception(self):
+        e = ParserRejectedMarkup(ValueError("bad markup"))
+        assert str(e) == "ValueError: bad markup"
+        assert e.args == ("ValueError: bad markup",)
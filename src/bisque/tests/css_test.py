@@ -1,4 +1,5 @@
 import types
+import warnings
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -109,6 +110,51 @@ class TestCSSSelectors(SoupTest):
         el = self.soup.select_one(sel)
         assert "main" == el["id"]
 
+    def test_selector_strings_are_compiled_once(self):
+        self.soup.css.cache_clear()
+        first = self.soup.select("div p")
+        hits = self.soup.css.cache_info().hits
+        assert self.soup.select("div p") == first
+        assert self.soup.css.cache_info().hits == hits + 1
+        # A different namespace mapping is a different cache entry.
+        self.soup.select("div p", namespaces={"ns1": "http://example.com/"})
+        assert self.soup.css.cache_info().currsize == 2
+
+    def test_precompile(self):
+        compiled = CSS.precompile("div p")
+        assert compiled is CSS.precompile("div p")
+        assert self.soup.select(compiled) == self.soup.select("div p")
+        # No namespaces are filled in from any document.
+        assert not compiled.namespaces
+        ns = {"ns1": "http://example.com/"}
+        assert CSS.precompile("ns1|p", ns).namespaces == ns
+
+    def test_css_objects_have_no_instance_dict(self):
+        # Tag.css makes a new CSS object on each access; keep them small.
+        assert not hasattr(self.soup.css, "__dict__")
+
+    def test_compiled_selectors_are_shared_between_tags(self):
+        # Each access to .css makes a new CSS object, but they all
+        # draw on the same cache.
+        div = self.soup.find("div")
+        assert div.css.compile("div p") is self.soup.css.compile("div p")
+
+    def test_type_selectors_match_chinois(self):
+        # Bare type selectors are run without going through chinois;
+        # the results must be the same as chinois would give.
+        self.soup.find("p").append(self.soup.new_tag("DIV"))
+
+        def ids(results):
+            return [id(el) for el in results]
+
+        for select in ["div", "DIV", "p", "h1", "x", "custom-dashed"]:
+            compiled = self.soup.css.compile(select)
+            assert ids(self.soup.select(select)) == ids(self.soup.select(compiled))
+            assert ids(self.soup.select(select, limit=2)) == ids(
+                self.soup.select(compiled, limit=2),
+            )
+            assert self.soup.select_one(select) is self.soup.select_one(compiled)
+
     def test_one_tag_one(self):
         els = self.soup.select("title")
         assert len(els) == 1
@@ -498,6 +544,35 @@ class TestCSSSelectors(SoupTest):
         assert inner.css.match("div[id=main]") == False
         assert main.css.match("div[id=main]") == True
 
+    def test_select_union(self):
+        results = self.soup.css.select_union(["h2", "#header1", "h2"])
+        assert isinstance(results, ResultSet)
+        # One of each match, in document order.
+        assert [el["id"] for el in results] == ["header1", "header2", "header3"]
+        assert self.soup.css.select_union([]) == []
+
+    def test_select_partitioned(self):
+        results = self.soup.css.select_partitioned(["h2", "#header1", "h1, h2"])
+        assert list(results) == ["h2", "#header1", "h1, h2"]
+        assert [el["id"] for el in results["h2"]] == ["header2", "header3"]
+        assert [el["id"] for el in results["#header1"]] == ["header1"]
+        assert [el["id"] for el in results["h1, h2"]] == [
+            "header1",
+            "header2",
+            "header3",
+        ]
+        assert all(isinstance(rs, ResultSet) for rs in results.values())
+
+    def test_select_partitioned_scope(self):
+        soup = Bisque(
+            "<div><p>child</p><section><p>grandchild</p></section></div>",
+            "html.parser",
+        )
+        results = soup.div.css.select_partitioned([":scope > p", "section"])
+        assert results[":scope > p"] == soup.div.css.select(":scope > p")
+        assert [p.string for p in results[":scope > p"]] == ["child"]
+        assert results["section"] == [soup.section]
+
     def test_iselect(self):
         gen = self.soup.css.iselect("h2")
         assert isinstance(gen, types.GeneratorType)
@@ -515,8 +590,30 @@ class TestCSSSelectors(SoupTest):
         [result] = results
         assert result["id"] == "header3"
 
+    def test_filter_many(self):
+        inner = self.soup.find("div", id="inner")
+        selects = ["h2", "h2[id=header3]", ":scope > p", "h2", "x"]
+        results = inner.css.filter_many(selects)
+        assert all(isinstance(rs, ResultSet) for rs in results)
+        assert results == [inner.css.filter(select) for select in selects]
+        assert len(results[0]) == 2
+
     def test_escape(self):
         m = self.soup.css.escape
         assert m(".foo#bar") == "\\.foo\\#bar"
         assert m("()[]{}") == "\\(\\)\\[\\]\\{\\}"
         assert m(".foo") == self.soup.css.escape(".foo")
+
+
+def test_missing_chinois_warns_once(monkeypatch):
+    from bisque import css
+
+    monkeypatch.setattr(css, "_warned_missing_chinois", False)
+    tag = Bisque("<a></a>", "html.parser").a
+    with pytest.warns(UserWarning, match="chinois package is not installed"):
+        with pytest.raises(NotImplementedError):
+            CSS(tag, api=None)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        with pytest.raises(NotImplementedError):
+            CSS(tag, api=None)
@@ -133,6 +133,50 @@ class TestEncodingDetector:
             logging.disable(logging.NOTSET)
             bisque.dammit.chardet_dammit = chardet
 
+    def test_encodings_worked_out_once(self, monkeypatch):
+        # When no encoding works, UnicodeDammit tries them all again
+        # with character replacement, but doesn't look for a declared
+        # encoding again, even though it didn't find one.
+        calls = []
+
+        def find_declared_encoding(*args, **kwargs):
+            calls.append(args)
+            return None
+
+        monkeypatch.setattr(
+            EncodingDetector,
+            "find_declared_encoding",
+            staticmethod(find_declared_encoding),
+        )
+        # A detector might find an encoding that works.
+        monkeypatch.setattr(bisque.dammit.detection, "chardet_dammit", lambda s: None)
+        logging.disable(logging.WARNING)
+        try:
+            dammit = UnicodeDammit(b"\x81\x8d", exclude_encodings=["ascii"])
+        finally:
+            logging.disable(logging.NOTSET)
+        assert dammit.contains_replacement_characters
+        assert len(calls) == 1
+
+    def test_chardet_skipped_for_ascii(self, monkeypatch):
+        def detect(s):
+            return {"encoding": "not-ascii"}
+
+        monkeypatch.setattr(bisque.dammit.detection, "chardet_detect", detect)
+        chardet_dammit = bisque.dammit.detection.chardet_dammit
+        assert chardet_dammit(b"<p>plain</p>") == "ascii"
+        assert chardet_dammit(b"<p>caf\xe9</p>") == "not-ascii"
+        assert chardet_dammit(b"") == "not-ascii"
+
+        # 7-bit escape encodings are ASCII bytes, but only the
+        # detector can tell what they are.
+        iso_2022_jp = "<p>こんにちは</p>".encode("iso-2022-jp")
+        assert iso_2022_jp.isascii()
+        assert chardet_dammit(iso_2022_jp) == "not-ascii"
+        hz = "<p>你好</p>".encode("hz")
+        assert hz.isascii()
+        assert chardet_dammit(hz) == "not-ascii"
+
     def test_byte_order_mark_removed(self):
         # A document written in UTF-16LE will have its byte order marker stripped.
         data = b"\xff\xfe<\x00a\x00>\x00\xe1\x00\xe9\x00<\x00/\x00a\x00>\x00"
@@ -140,6 +184,22 @@ class TestEncodingDetector:
         assert "<a>áé</a>" == dammit.unicode_markup
         assert "utf-16le" == dammit.original_encoding
 
+    @pytest.mark.parametrize(
+        "encoding",
+        ["utf-8", "utf-16le", "utf-16be", "utf-32le", "utf-32be"],
+    )
+    def test_byte_order_marks(self, encoding):
+        # The UTF-32LE byte order mark starts with the UTF-16LE one,
+        # so it has to be checked for first.
+        data = "\ufeff<a>áé</a>".encode(encoding)
+        assert EncodingDetector.strip_byte_order_mark(data) == (
+            "<a>áé</a>".encode(encoding),
+            encoding,
+        )
+        dammit = UnicodeDammit(data)
+        assert "<a>áé</a>" == dammit.unicode_markup
+        assert encoding == dammit.original_encoding
+
     def test_known_definite_versus_user_encodings(self):
         # The known_definite_encodings are used before sniffing the
         # byte-order mark; the user_encodings are used afterwards.
@@ -231,6 +291,24 @@ class TestEncodingDetector:
             output = UnicodeDammit.detwingle(input)
             assert output == input
 
+    def test_detwingle_mixed_document_ignores_multibyte_characters(self):
+        # Valid UTF-8 is returned without being scanned, so put a
+        # Windows-1252 smart quote in front of each multibyte character
+        # to make sure the scan itself skips over it.
+        quote = "\N{LEFT DOUBLE QUOTATION MARK}".encode("utf8")
+        for tricky_unicode_char in (
+            "\N{LATIN SMALL LIGATURE OE}",
+            "\N{LATIN SUBSCRIPT SMALL LETTER X}",
+            "\xf0\x90\x90\x93",
+        ):
+            input = tricky_unicode_char.encode("utf8")
+            output = UnicodeDammit.detwingle(b"\x93" + input)
+            assert output == quote + input
+
+        # A multibyte character cut off by the end of the document
+        # swallows whatever bytes are left.
+        assert UnicodeDammit.detwingle(b"\x93a\xe2\x93") == quote + b"a\xe2\x93"
+
     def test_find_declared_encoding(self):
         # Test our ability to find a declared encoding inside an
         # XML or HTML document.
@@ -272,6 +350,15 @@ class TestEncodingDetector:
         assert m(b" " + xml_bytes, search_entire_document=True) == "iso-8859-1"
         assert m(b"a" + xml_bytes, search_entire_document=True) is None
 
+    def test_find_declared_encoding_after_unterminated_meta_tags(self):
+        # Many "<meta"s with no closing ">" used to make the search
+        # take quadratic time. A charset declared after them is still
+        # found.
+        m = EncodingDetector.find_declared_encoding
+        markup = "<meta " * 50000 + '><meta charset="utf-8">'
+        assert m(markup, is_html=True, search_entire_document=True) == "utf-8"
+        assert m(markup.encode("ascii"), is_html=True) is None
+
 
 class TestEntitySubstitution:
     """Standalone tests of the EntitySubstitution class."""
@@ -332,6 +419,25 @@ class TestEntitySubstitution:
         markup = "fjords &sqcups; penguins"
         assert self.sub.substitute_html(data) == markup
 
+    def test_entity_tables_become_plain_class_attributes(self):
+        assert self.sub.HTML_ENTITY_TO_CHARACTER["amp"] == "&"
+        for name in (
+            "CHARACTER_TO_HTML_ENTITY",
+            "HTML_ENTITY_TO_CHARACTER",
+            "CHARACTER_TO_HTML_ENTITY_RE",
+        ):
+            assert not hasattr(vars(EntitySubstitution)[name], "__get__")
+
+    def test_characters_that_only_look_like_an_entity(self):
+        # U+2267 is &geqq; and U+200A is &hairsp;, but together they're
+        # not an entity, unlike U+205F U+200A, &ThickSpace;.
+        data = "≧    "
+        assert self.sub.substitute_html(data) == "&geqq;&hairsp; &ThickSpace;"
+
+        # U+1D4A0 sits among the script capitals, but it has no entity.
+        data = "\U0001d49c\U0001d4a0̸"
+        assert self.sub.substitute_html(data) == "&Ascr;\U0001d4a0̸"
+
     def test_xml_converstion_includes_no_quotes_if_make_quoted_attribute_is_false(self):
         s = 'Welcome to "my bar"'
         assert self.sub.substitute_xml(s, False) == s
@@ -9,6 +9,7 @@ from bisque.element import (
     ContentMetaAttributeValue,
     NamespacedAttribute,
 )
+from bisque.models import StrRoot
 
 from . import SoupTest
 
@@ -72,3 +73,20 @@ class TestAttributeValueWithCharsetSubstitution:
         assert "text/html; charset=euc-jp" == value.original_value
         assert "text/html; charset=utf8" == value.encode("utf8")
         assert "text/html; charset=ascii" == value.encode("ascii")
+
+    def test_content_meta_attribute_value_with_several_charsets(self):
+        value = ContentMetaAttributeValue(original_value="charset=a; x=1; charset=b")
+        assert "charset=utf8; x=1; charset=utf8" == value.encode("utf8")
+        # Encoding again gives the same answer.
+        assert "charset=utf8; x=1; charset=utf8" == value.encode("utf8")
+        assert "charset=ascii; x=1; charset=ascii" == value.encode("ascii")
+
+    def test_content_meta_attribute_value_create(self):
+        value = ContentMetaAttributeValue.create("text/html; charset=euc-jp")
+        assert isinstance(value, ContentMetaAttributeValue)
+        assert "text/html; charset=utf8" == value.encode("utf8")
+
+        # Without a charset there's nothing to substitute.
+        value = ContentMetaAttributeValue.create("text/html")
+        assert isinstance(value, StrRoot)
+        assert "text/html" == value
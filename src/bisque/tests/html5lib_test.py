@@ -5,7 +5,7 @@ import warnings
 import pytest
 
 from bisque import Bisque
-from bisque.element import SoupStrainer
+from bisque.element import NamespacedAttribute, SoupStrainer
 
 from . import HTML5LIB_PRESENT, HTML5TreeBuilderSmokeTest, SoupTest
 
@@ -122,6 +122,30 @@ class TestHTML5LibBuilder(SoupTest, HTML5TreeBuilderSmokeTest):
         assert final_aftermath == target.next_element
         assert target == final_aftermath.previous_element
 
+    def test_consecutive_strings_are_merged(self):
+        # Strings separated only by ignored end tags end up as a single
+        # NavigableString, correctly linked into the tree.
+        soup = self.soup("<p>a</a>b</a>c<b>x</b>d</a>e</p>")
+        assert ["abc", "x", "de"] == [str(s) for s in soup.p.find_all(string=True)]
+        abc, b, de = soup.p.contents
+        assert abc.previous_element is soup.p
+        assert abc.next_element is b
+        assert b.string.next_element is de
+        assert de.previous_element is b.string
+
+    def test_namespaced_attributes(self):
+        markup = '<svg><a xlink:href="#x" xml:lang="en"/><a xlink:href="#y"/></svg>'
+        soup = self.soup(markup)
+        first, second = soup.find_all("a")
+        [href] = [name for name in first.attrs if name == "xlink:href"]
+        assert isinstance(href, NamespacedAttribute)
+        assert "xlink" == href.prefix
+        assert "href" == href.name
+        assert "http://www.w3.org/1999/xlink" == href.namespace
+        assert "#x" == first["xlink:href"]
+        assert "en" == first["xml:lang"]
+        assert "#y" == second["xlink:href"]
+
     def test_processing_instruction(self):
         """Processing instructions become comments."""
         markup = b"""<?PITarget PIContent?>"""
@@ -143,6 +167,12 @@ class TestHTML5LibBuilder(SoupTest, HTML5TreeBuilderSmokeTest):
             == soup.body.decode()
         )
 
+    def test_last_descendant_cache_cleared(self):
+        # Foster parenting inserts into an earlier element, which uses the
+        # cache; nothing should still reference it once parsing is done.
+        soup = self.soup(b"<table><td></tbody>A<p>B</p>")
+        assert soup.last_descendant_cache is None
+
     def test_extraction(self):
         """
         Test that extraction does not destroy the tree.